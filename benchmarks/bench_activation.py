@@ -0,0 +1,50 @@
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+
+
+def frame_ms(game, ticks):
+    start = time.perf_counter()
+    game.step(ticks)
+    return (time.perf_counter() - start) / ticks * 1000
+
+
+def main(ticks=200):
+    pygame.init()
+    pygame.display.set_mode((640, 480))
+    from game import Game
+    from scripts.activation import ActivationRegion
+    from scripts.mapgen import save_map
+
+    rows = []
+    # the map loader reports every file it reads
+    with contextlib.redirect_stdout(io.StringIO()):
+        for width, enemies in ((60, 5), (960, 80), (3840, 320)):
+            path = os.path.join(tempfile.mkdtemp(), "stress.json")
+            save_map(path, width=width, spawners={"enemy": enemies, "box": enemies, "bird": enemies // 4, "mob": enemies // 4}, seed=0)
+            timings = []
+            for awake_everywhere in (True, False):
+                game = Game(0, headless=True, seed=0, map_path=path)
+                if awake_everywhere:
+                    # a radius nothing falls outside of: every entity updates every tick, as before the activation region
+                    game.activation = ActivationRegion(radius=10**9, sleep_interval=0)
+                timings.append(frame_ms(game, ticks))
+            rows.append((width, enemies) + tuple(timings))
+
+    print(f"{'width':>6} {'enemies':>8} {'all awake ms':>13} {'activation ms':>14}")
+    for width, enemies, awake, active in rows:
+        print(f"{width:>6} {enemies:>8} {awake:>13.3f} {active:>14.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+import contextlib
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+
+
+def scan_under(editor, mpos):
+    # what the erase and pick tools did every frame: a rect and two asset lookups for every offgrid tile
+    hits = []
+    for tile in editor.tilemap.offgrid_tiles:
+        tile_img = editor.assets[tile["type"]][tile["variant"]]
+        tile_r = pygame.Rect(tile["pos"][0] - editor.scroll[0], tile["pos"][1] - editor.scroll[1], tile_img.get_width(), tile_img.get_height())
+        if tile_r.collidepoint(mpos):
+            hits.append(tile)
+    return hits
+
+
+def frame_ms(editor, under, points):
+    start = time.perf_counter()
+    for scroll, mpos in points:
+        editor.scroll = scroll
+        under(editor, mpos)
+    return (time.perf_counter() - start) * 1000 / len(points)
+
+
+def ghost_ms(editor, frames):
+    start = time.perf_counter()
+    for _ in range(frames):
+        img = editor.assets[editor.tile_list[editor.tile_group]][editor.tile_variant].copy()
+        img.set_alpha(150)
+    copied = (time.perf_counter() - start) * 1000 / frames
+    start = time.perf_counter()
+    for _ in range(frames):
+        editor.ghost()
+    return copied, (time.perf_counter() - start) * 1000 / frames
+
+
+def main(frames=200):
+    pygame.init()
+    pygame.display.set_mode((640, 480))
+    from editor import Editor
+    from scripts.mapgen import save_map
+
+    # the editor needs a map.json and reports every map it reads
+    with contextlib.redirect_stdout(io.StringIO()):
+        editor = Editor()
+    rng = random.Random(0)
+    rows = []
+    for decor in (1000, 10000, 50000):
+        path = os.path.join(tempfile.mkdtemp(), "decor.json")
+        with contextlib.redirect_stdout(io.StringIO()):
+            save_map(path, width=480, decor=decor, seed=0)
+            editor.tilemap.load(path)
+        editor.journal.reset(editor.tilemap)
+        points = [([rng.randrange(480 * 16 - 320), rng.randrange(24 * 16 - 240)], (rng.random() * 320, rng.random() * 240)) for _ in range(frames)]
+        scan = frame_ms(editor, scan_under, points[: max(10, frames // 10)])
+        indexed = frame_ms(editor, Editor.offgrid_under, points)
+        rows.append((len(editor.tilemap.offgrid_tiles), scan, indexed))
+
+    print(f"{'offgrid':>8} {'scan ms':>8} {'index ms':>9} {'speedup':>8}")
+    for count, scan, indexed in rows:
+        print(f"{count:>8} {scan:>8.3f} {indexed:>9.4f} {scan / indexed:>7.0f}x")
+    copied, cached = ghost_ms(editor, frames * 10)
+    print(f"ghost preview: copy {copied:.4f} ms, cached {cached:.4f} ms")
+
+
+if __name__ == "__main__":
+    main()
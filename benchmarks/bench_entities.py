@@ -0,0 +1,63 @@
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+
+
+def main(count=10000, ticks=20):
+    random.seed(0)
+    pygame.init()
+    pygame.display.set_mode((640, 480))
+    from game import Game
+    from scripts.entities import Box, Enemy
+
+    game = Game(-1)
+    game.boxes = []
+    game.enemies = []
+    xs = [int(loc.split(";")[0]) for loc in game.tilemap.tilemap]
+    lo, hi = min(xs) * 16, max(xs) * 16
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    entities = []
+    for i in range(count):
+        pos = (random.uniform(lo, hi), random.uniform(-200, 200))
+        if i % 2:
+            entities.append(Enemy(game, pos, (8, 15)))
+        else:
+            entities.append(Box(game, pos, (10, 10)))
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    used = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+
+    game.boxes = [e for e in entities if isinstance(e, Box)]
+    game.enemies = [e for e in entities if isinstance(e, Enemy)]
+    start = time.perf_counter()
+    for _ in range(ticks):
+        game.box_grid.rebuild(game.boxes)
+        for box in game.boxes.copy():
+            if box.update(game.tilemap, (0, 0)):
+                game.boxes.remove(box)
+        for enemy in game.enemies.copy():
+            if enemy.update(game.tilemap, (0, 0)):
+                game.enemies.remove(enemy)
+        game.projectiles.clear()
+        game.sparks.clear()
+        game.particles.clear()
+    elapsed = time.perf_counter() - start
+
+    print(f"entities: {count}")
+    print(f"memory per entity: {used / count:.0f} bytes")
+    print(f"update throughput: {count * ticks / elapsed:,.0f} entity updates/s ({elapsed / ticks * 1000:.1f} ms/tick)")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
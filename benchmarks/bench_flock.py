@@ -0,0 +1,45 @@
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+
+
+def main(ticks=200):
+    random.seed(0)
+    pygame.init()
+    pygame.display.set_mode((640, 480))
+    from game import Game
+    from scripts.entities import Bird
+
+    game = Game(-1)
+    px, py = game.player.pos
+    print(f"{'birds':>6} {'flock ms/tick':>14} {'startled/tick':>14}")
+    for count in (100, 1000, 5000):
+        birds = [Bird(game, (px + random.uniform(-600, 600), py + random.uniform(-300, 300)), (18, 12)) for _ in range(count)]
+        elapsed = 0
+        startled = 0
+        for tick in range(ticks):
+            # sweep the player through the flock so some birds take off every tick
+            game.player.pos = [px + (tick % 100) * 12 - 600, py]
+            before = sum(bird.flight == 50 for bird in birds)
+            start = time.perf_counter()
+            game.flock.step(birds)
+            game.flock.flush_audio()
+            elapsed += time.perf_counter() - start
+            startled += sum(bird.flight == 50 for bird in birds) - before
+            for bird in birds:
+                bird.flight = max(0, bird.flight - 1)
+                bird.audio_played = 0
+                bird.alive = 1
+        print(f"{count:>6} {elapsed / ticks * 1000:>14.3f} {startled / ticks:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
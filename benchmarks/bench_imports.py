@@ -0,0 +1,49 @@
+import os
+import subprocess
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# what each entry point imports before it does any work
+TARGETS = {
+    "game": "import game",
+    "editor": "import editor",
+    "entities": "import scripts.entities",
+    "mapgen": "import scripts.mapgen",
+    "reachability": "import scripts.reachability",
+    "batch": "import scripts.batch",
+}
+
+
+def import_ms(code):
+    # -X importtime reports every module; the top-level lines add up to the whole import
+    env = dict(os.environ, SDL_VIDEODRIVER="dummy", SDL_AUDIODRIVER="dummy")
+    err = subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True, env=env, check=True).stderr
+    total = 0
+    modules = 0
+    for line in err.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        modules += 1
+        if not name.startswith("  "):
+            total += int(cumulative)
+    return total / 1000, modules
+
+
+def main(runs=7):
+    print(f"{'entry point':>14} {'median ms':>10} {'modules':>8} {'pygame':>7}")
+    for name, code in TARGETS.items():
+        results = sorted(import_ms(code) for _ in range(runs))
+        ms, modules = results[runs // 2]
+        loaded = subprocess.run(
+            [sys.executable, "-c", code + "; import sys; print('pygame' in sys.modules)"],
+            capture_output=True,
+            text=True,
+            env=dict(os.environ, SDL_VIDEODRIVER="dummy", SDL_AUDIODRIVER="dummy"),
+        ).stdout.strip().splitlines()[-1]
+        print(f"{name:>14} {ms:>10.1f} {modules:>8} {'yes' if loaded == 'True' else 'no':>7}")
+
+
+if __name__ == "__main__":
+    main()
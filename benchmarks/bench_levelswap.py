@@ -0,0 +1,66 @@
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+
+
+def swap_ms(game, path, preload, runs):
+    best = None
+    for _ in range(runs):
+        game.map_path = path
+        game.level_backgrounds.clear()
+        if preload:
+            # what the previous level and the fade-out leave behind for the swap frame
+            game.levels.request(path)
+            game.levels.pending[path][1].result()
+            game.prepare_next_level()
+        else:
+            # let the worker go idle so it does not compete with the blocking read
+            for _, future in game.levels.pending.values():
+                future.result()
+            game.levels.pending.clear()
+        start = time.perf_counter()
+        game.load_level(game.level)
+        game.level_background(game.background, game.display_2.get_size())
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main(runs=5):
+    pygame.init()
+    pygame.display.set_mode((640, 480))
+    from game import Game
+    from scripts.levels import level_path, count_levels
+    from scripts.mapgen import save_map
+
+    rows = []
+    # the map loader reports every file it reads, from both threads
+    with contextlib.redirect_stdout(io.StringIO()):
+        game = Game(0, headless=True, render_frames=True, seed=0)
+        maps = [(level_path(map_id), "level " + str(map_id)) for map_id in range(count_levels())]
+        for width in (960, 3840):
+            path = os.path.join(tempfile.mkdtemp(), "stress.json")
+            save_map(path, width=width, spawners={"enemy": width // 12, "box": width // 12, "bird": width // 48, "mob": width // 48}, seed=0)
+            maps.append((path, "generated " + str(width)))
+        for path, label in maps:
+            rows.append((label, swap_ms(game, path, False, runs), swap_ms(game, path, True, runs)))
+        for _, future in game.levels.pending.values():
+            future.result()
+
+    print(f"{'map':>16} {'blocking ms':>12} {'preloaded ms':>13}")
+    for label, blocking, preloaded in rows:
+        print(f"{label:>16} {blocking:>12.2f} {preloaded:>13.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+
+
+def main(ticks=200):
+    pygame.init()
+    pygame.display.set_mode((640, 480))
+    from game import Game
+    from scripts.mapgen import save_map
+
+    path = os.path.join(tempfile.mkdtemp(), "stress.json")
+    print(f"{'width':>6} {'enemies':>8} {'boxes':>6} {'tiles':>6} {'ms/frame':>9}")
+    for width, enemies in ((60, 5), (240, 20), (960, 80), (3840, 320)):
+        tilemap = save_map(path, width=width, spawners={"enemy": enemies, "box": enemies, "bird": enemies // 4, "mob": enemies // 4}, seed=0)
+        game = Game(0, headless=True, render_frames=True, seed=0, map_path=path)
+        start = time.perf_counter()
+        game.step(ticks)
+        elapsed = time.perf_counter() - start
+        print(f"{width:>6} {enemies:>8} {enemies:>6} {len(tilemap.tilemap):>6} {elapsed / ticks * 1000:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
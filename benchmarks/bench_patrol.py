@@ -0,0 +1,42 @@
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+
+
+def main(ticks=300):
+    random.seed(0)
+    pygame.init()
+    pygame.display.set_mode((640, 480))
+    from game import Game
+    from scripts.entities import Enemy
+
+    game = Game(-1)
+    spots = [enemy.pos for enemy in game.enemies]
+    print(f"{'agents':>7} {'patrol ms/tick':>15} {'walking':>8} {'shots':>6}")
+    for count in (10, 100, 300, 1000):
+        agents = [Enemy(game, (spots[i % len(spots)][0] + random.randint(-8, 8), spots[i % len(spots)][1]), (8, 15)) for i in range(count)]
+        game.projectiles = []
+        elapsed = 0
+        walking = 0
+        for _ in range(ticks):
+            start = time.perf_counter()
+            movements = game.patrol.step(agents, game.tilemap)
+            elapsed += time.perf_counter() - start
+            walking += sum(1 for movement in movements if movement[0])
+            for agent, movement in zip(agents, movements):
+                agent.update(game.tilemap, movement)
+            game.sparks.clear()
+            game.particles.clear()
+        print(f"{count:>7} {elapsed / ticks * 1000:>15.3f} {walking / ticks:>8.1f} {len(game.projectiles):>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+
+rect_count = 0
+
+
+class CountingRect(pygame.Rect):
+    def __init__(self, *args):
+        global rect_count
+        rect_count += 1
+        super().__init__(*args)
+
+
+def main(extra_boxes=200, frames=300):
+    global rect_count
+    random.seed(0)
+    pygame.init()
+    pygame.display.set_mode((640, 480))
+    from game import Game
+
+    game = Game(-1)
+    spots = [box.pos for box in game.boxes]
+    for i in range(extra_boxes):
+        x, y = spots[i % len(spots)]
+        game.boxes.append(type(game.boxes[0])(game, (x + random.randint(-40, 40), y - 12 * (i // len(spots) + 1)), (10, 10)))
+
+    pygame.Rect = CountingRect
+    rect_count = 0
+    start = time.perf_counter()
+    for _ in range(frames):
+        game.box_grid.rebuild(game.boxes)
+        for box in game.boxes.copy():
+            if box.update(game.tilemap, (0, 0)):
+                game.boxes.remove(box)
+        for enemy in game.enemies.copy():
+            if enemy.update(game.tilemap, (0, 0)):
+                game.enemies.remove(enemy)
+        game.player.update(game.tilemap, (0, 0))
+        for bird in game.birds:
+            bird.update(game.tilemap, (0, 0))
+    elapsed = time.perf_counter() - start
+
+    entities = len(game.boxes) + len(game.enemies) + len(game.birds) + 1
+    print(f"entities: {entities} ({len(game.boxes)} boxes)")
+    print(f"Rect allocations per frame: {rect_count / frames:.0f}")
+    print(f"entity update time per frame: {elapsed / frames * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,65 @@
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.journal import EditJournal
+from scripts.tilemap import Tilemap
+
+
+def cell_by_cell_ms(size):
+    # the brush: one set_cell per frame, each its own step of undo
+    tilemap = Tilemap(None)
+    journal = EditJournal()
+    start = time.perf_counter()
+    for x in range(size):
+        for y in range(size):
+            journal.set_cell(tilemap, str(x) + ";" + str(y), {"type": "grass", "variant": 0, "pos": [x, y]})
+            journal.end_stroke()
+    journal.autotile(tilemap)
+    return (time.perf_counter() - start) * 1000, size * size
+
+
+def region_ms(size, operation, runs=5):
+    return min(region_run(size, operation) for _ in range(runs))
+
+
+def region_run(size, operation):
+    tilemap = Tilemap(None)
+    journal = EditJournal()
+    if operation == "flood":
+        # an empty pocket walled in by stone, so the fill has edges to stop at
+        journal.apply(tilemap, tilemap.rect_cells((-1, -1), (size, size), "stone"))
+        journal.apply(tilemap, tilemap.rect_cells((0, 0), (size - 1, size - 1)))
+    elif operation == "stamp":
+        journal.apply(tilemap, tilemap.rect_cells((0, 0), (size - 1, size - 1), "grass", autotile=True))
+        stamp = tilemap.copy_region((0, 0), (size - 1, size - 1))
+    start = time.perf_counter()
+    if operation == "rect":
+        journal.apply(tilemap, tilemap.rect_cells((0, 0), (size - 1, size - 1), "grass", autotile=True))
+    elif operation == "flood":
+        journal.apply(tilemap, tilemap.flood_cells((0, 0), "grass", 0, (-1, -1), (size, size), autotile=True))
+    else:
+        cells, offgrid = tilemap.stamp_cells(stamp, (size, 0))
+        journal.apply(tilemap, cells, offgrid)
+    edit = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    journal.undo(tilemap)
+    return edit, (time.perf_counter() - start) * 1000, len(journal.redo_stack)
+
+
+def main(size=100):
+    with contextlib.redirect_stdout(io.StringIO()):
+        brush, cells = cell_by_cell_ms(size)
+    print(f"{cells} cells, painted one at a time then autotiled: {brush:.1f} ms, {cells + 1} undo steps")
+    print(f"{'operation':>10} {'edit ms':>8} {'undo ms':>8} {'undo steps':>11}")
+    for operation in ("rect", "flood", "stamp"):
+        edit, undo, steps = region_ms(size, operation)
+        print(f"{operation:>10} {edit:>8.2f} {undo:>8.2f} {steps:>11}")
+
+
+if __name__ == "__main__":
+    main()
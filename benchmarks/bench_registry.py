@@ -0,0 +1,45 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+
+
+def main(launches=5, lookups=200000):
+    pygame.init()
+    pygame.display.set_mode((640, 480))
+    from game import Game
+    from scripts.registry import registry, EDITOR_ASSETS, EDITOR_BACKGROUNDS
+
+    # the editor loads its palette first, then every SPACE press starts a Game from the same process
+    start = time.perf_counter()
+    registry.preload("editor", EDITOR_ASSETS, EDITOR_BACKGROUNDS)
+    editor_ms = (time.perf_counter() - start) * 1000
+    print(f"{'':>14} {'ms':>8} {'files loaded':>13}")
+    print(f"{'editor':>14} {editor_ms:>8.1f} {registry.loads:>13}")
+    for launch in range(launches):
+        loads = registry.loads
+        start = time.perf_counter()
+        game = Game(-1, headless=True)
+        print(f"{'play-test ' + str(launch + 1):>14} {(time.perf_counter() - start) * 1000:>8.1f} {registry.loads - loads:>13}")
+
+    # the per-spawn lookup entities and particles used to do, against the pre-resolved one
+    e_type, action = "player", "run"
+    start = time.perf_counter()
+    for _ in range(lookups):
+        game.assets[e_type + "/" + action].copy()
+    joined = time.perf_counter() - start
+    start = time.perf_counter()
+    for _ in range(lookups):
+        game.animations[e_type][action].copy()
+    resolved = time.perf_counter() - start
+    print(f"string key {joined / lookups * 1e9:.0f} ns/lookup, resolved {resolved / lookups * 1e9:.0f} ns/lookup")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+
+
+def respawn_ms(game, runs):
+    # what the death timer does once it runs out
+    times = []
+    for _ in range(runs):
+        game.enemies.clear()
+        game.player.pos[0] += 100
+        # the next level is parsed on the preloader thread; let it finish so it does not compete for the GIL
+        for _, future in game.levels.pending.values():
+            future.result()
+        start = time.perf_counter()
+        game.load_level(game.level)
+        times.append((time.perf_counter() - start) * 1000)
+    times.sort()
+    return times[len(times) // 2], times[-1]
+
+
+def main(runs=20):
+    pygame.init()
+    pygame.display.set_mode((640, 480))
+    from game import Game
+    from scripts.mapgen import save_map
+
+    rows = []
+    # the map loader reports every file it reads
+    with contextlib.redirect_stdout(io.StringIO()):
+        maps = [(None, 0, "level 0"), (None, 4, "level 4")]
+        for width in (960, 3840):
+            path = os.path.join(tempfile.mkdtemp(), "stress.json")
+            save_map(path, width=width, spawners={"enemy": width // 12, "box": width // 12, "bird": width // 48, "mob": width // 48}, seed=0)
+            maps.append((path, 0, "generated " + str(width)))
+        for path, level, label in maps:
+            game = Game(level, headless=True, seed=0, map_path=path)
+            spawned = len(game.enemies) + len(game.boxes) + len(game.birds) + len(game.mobs)
+            rows.append((label, len(game.tilemap.tilemap), spawned) + respawn_ms(game, runs))
+
+    print(f"{'map':>16} {'tiles':>6} {'entities':>9} {'median ms':>10} {'max ms':>7}")
+    for label, tiles, spawned, median, worst in rows:
+        print(f"{label:>16} {tiles:>6} {spawned:>9} {median:>10.3f} {worst:>7.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.mapgen import save_map
+from scripts.mapsaver import MapSaver
+from scripts.tilemap import Tilemap
+
+
+def blocking_ms(tilemap, path, runs):
+    # what the editor's save key used to cost the frame it was pressed on
+    best = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        tilemap.save(path)
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def saver_ms(tilemap, path, runs):
+    # time on the calling thread only; the write itself finishes on the worker before the next run
+    saver = MapSaver()
+    best = None
+    for version in range(runs):
+        start = time.perf_counter()
+        saver.save(tilemap, path, 0, version)
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+        saver.wait()
+    skipped = not saver.autosave(tilemap, os.path.basename(path), 0, runs - 1)
+    saver.pool.shutdown()
+    return best, skipped
+
+
+def main(runs=5):
+    rows = []
+    # every save reports the file it wrote
+    with contextlib.redirect_stdout(io.StringIO()):
+        maps = [("data/maps/0.json", "level 0")]
+        for width in (960, 3840, 15360):
+            path = os.path.join(tempfile.mkdtemp(), "stress.json")
+            save_map(path, width=width, seed=0)
+            maps.append((path, "generated " + str(width)))
+        for path, label in maps:
+            tilemap = Tilemap(None)
+            tilemap.load(path)
+            out = os.path.join(tempfile.mkdtemp(), "out.json")
+            rows.append((label, len(tilemap.tilemap) + len(tilemap.offgrid_tiles), blocking_ms(tilemap, out, runs)) + saver_ms(tilemap, out, runs))
+
+    print(f"{'map':>16} {'tiles':>6} {'blocking ms':>12} {'ui thread ms':>13} {'unchanged skipped':>18}")
+    for label, tiles, blocking, snapshot, skipped in rows:
+        print(f"{label:>16} {tiles:>6} {blocking:>12.2f} {snapshot:>13.3f} {'yes' if skipped else 'no':>18}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+
+
+def main(ticks=100):
+    random.seed(0)
+    pygame.init()
+    pygame.display.set_mode((640, 480))
+    from game import Game
+    from scripts.entities import Enemy, Box
+
+    game = Game(-1)
+    game.sound_queue.begin(game.player.rect().center, 160)
+    px, py = game.player.pos
+    print(f"{'dying':>6} {'requests/tick':>14} {'plays/tick':>11} {'ms/tick':>8}")
+    for count in (10, 100, 1000):
+        # a big fight: enemies and boxes spread around the camera all die on the same tick
+        spots = [(px + random.uniform(-800, 800), py + random.uniform(-200, 200)) for _ in range(count)]
+        queue = game.sound_queue
+        queue.requested = queue.played = 0
+        elapsed = 0
+        for _ in range(ticks):
+            dying = [Enemy(game, pos, (8, 15)) for pos in spots[::2]] + [Box(game, pos, (10, 10)) for pos in spots[1::2]]
+            for entity in dying:
+                entity.alive = 0
+            start = time.perf_counter()
+            for entity in dying:
+                entity.update(game.tilemap)
+            queue.flush()
+            elapsed += time.perf_counter() - start
+            game.sparks.clear()
+            game.particles.clear()
+        print(f"{count:>6} {queue.requested / ticks:>14.1f} {queue.played / ticks:>11.1f} {elapsed / ticks * 1000:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
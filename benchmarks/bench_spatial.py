@@ -0,0 +1,77 @@
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame
+
+from scripts.spatial import SpatialHash
+from scripts.entities import get_movables
+
+
+class StubBox:
+    def __init__(self, pos):
+        self.pos = list(pos)
+        self.is_held = 0
+        self.alive = 1
+
+    def rect(self):
+        return pygame.Rect(self.pos[0], self.pos[1], 10, 10)
+
+
+class StubGame:
+    def __init__(self, count, span):
+        self.boxes = [StubBox((random.random() * span, random.random() * span)) for _ in range(count)]
+        self.enemies = [StubBox((random.random() * span, random.random() * span)) for _ in range(count)]
+        self.projectiles = [[random.random() * span, random.random() * span] for _ in range(count // 4 + 1)]
+        self.box_grid = SpatialHash(cell_size=32)
+        self.enemy_grid = SpatialHash(cell_size=32)
+
+
+def tick_all_pairs(game):
+    for entity in game.boxes + game.enemies:
+        my_rect = entity.rect()
+        for dstr in game.boxes.copy():
+            rect = dstr.rect()
+            if rect != my_rect:
+                my_rect.colliderect(rect)
+    for pos in game.projectiles:
+        for enemy in game.enemies:
+            enemy.rect().collidepoint(pos)
+
+
+def tick_grid(game):
+    game.box_grid.rebuild(game.boxes)
+    for entity in game.boxes + game.enemies:
+        my_rect = entity.rect()
+        for rect in get_movables(game, my_rect):
+            my_rect.colliderect(rect)
+    game.enemy_grid.rebuild(game.enemies)
+    for pos in game.projectiles:
+        for enemy in game.enemy_grid.query_point(pos):
+            enemy.rect().collidepoint(pos)
+
+
+def measure(tick, game, ticks):
+    start = time.perf_counter()
+    for _ in range(ticks):
+        tick(game)
+    return (time.perf_counter() - start) / ticks * 1000
+
+
+def main():
+    random.seed(0)
+    print(f"{'entities':>8} {'all-pairs ms':>13} {'grid ms':>9} {'speedup':>8}")
+    for count in (10, 30, 100, 300, 1000):
+        # keep density constant so the level grows with its population
+        game = StubGame(count, span=(count ** 0.5) * 48)
+        ticks = max(1, 2000 // count)
+        brute = measure(tick_all_pairs, game, max(1, ticks // 4))
+        grid = measure(tick_grid, game, ticks)
+        print(f"{count:>8} {brute:>13.3f} {grid:>9.3f} {brute / grid:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+import os
+import shutil
+import subprocess
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.assetcache import CACHE_DIR
+
+# runs in a fresh interpreter each time so imports, decoding and the first frame are all cold
+CHILD = """
+import time
+start = time.perf_counter()
+import os
+os.environ["SDL_VIDEODRIVER"] = "dummy"
+os.environ["SDL_AUDIODRIVER"] = "dummy"
+import pygame
+from game import Game
+game = Game(0, seed=0)
+loaded = time.perf_counter()
+game.tick()
+pygame.display.update()
+print(loaded - start, time.perf_counter() - start)
+"""
+
+
+def run(runs, clear_cache):
+    loads = []
+    firsts = []
+    for _ in range(runs):
+        if clear_cache:
+            shutil.rmtree(CACHE_DIR, ignore_errors=True)
+        out = subprocess.run([sys.executable, "-c", CHILD], capture_output=True, text=True, cwd=os.getcwd(), check=True).stdout
+        load, first = map(float, out.strip().splitlines()[-1].split())
+        loads.append(load)
+        firsts.append(first)
+    return sum(loads) / runs, sum(firsts) / runs, min(firsts)
+
+
+def main(runs=5):
+    print(f"{'asset cache':>12} {'init ms':>8} {'first frame ms':>15} {'best first frame ms':>20}")
+    for label, clear_cache in (("cold", True), ("warm", False)):
+        load, first, best = run(runs, clear_cache)
+        print(f"{label:>12} {load * 1000:>8.0f} {first * 1000:>15.0f} {best * 1000:>20.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+import contextlib
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.journal import EditJournal
+from scripts.mapgen import save_map
+from scripts.tilemap import Tilemap
+
+
+def strokes(tilemap, count, length, seed=0):
+    # short drags of painting and erasing around the existing map, like a session in the editor
+    rng = random.Random(seed)
+    locs = list(tilemap.tilemap)
+    result = []
+    for _ in range(count):
+        x, y = (int(v) for v in rng.choice(locs).split(";"))
+        stroke = []
+        for step in range(length):
+            loc = str(x + step) + ";" + str(y)
+            if rng.random() < 0.3:
+                stroke.append((loc, None))
+            else:
+                stroke.append((loc, {"type": "grass", "variant": rng.randint(0, 8), "pos": [x + step, y]}))
+        result.append(stroke)
+    return result
+
+
+def backup_ms(path, edits):
+    # the old scheme: the whole map written to saved_maps after each edit, and read back to undo one
+    tilemap = Tilemap(None)
+    tilemap.load(path)
+    folder = tempfile.mkdtemp()
+    start = time.perf_counter()
+    for index, stroke in enumerate(edits):
+        for loc, tile in stroke:
+            if tile is None:
+                tilemap.tilemap.pop(loc, None)
+            else:
+                tilemap.tilemap[loc] = tile
+        tilemap.save(os.path.join(folder, str(index) + ".json"))
+    edit = time.perf_counter() - start
+    start = time.perf_counter()
+    for index in range(len(edits) - 2, -1, -1):
+        tilemap.load(os.path.join(folder, str(index) + ".json"))
+    undo = time.perf_counter() - start
+    size = sum(os.path.getsize(os.path.join(folder, name)) for name in os.listdir(folder))
+    return edit * 1000 / len(edits), undo * 1000 / (len(edits) - 1), size
+
+
+def journal_ms(path, edits):
+    tilemap = Tilemap(None)
+    tilemap.load(path)
+    journal = EditJournal()
+    start = time.perf_counter()
+    for stroke in edits:
+        for loc, tile in stroke:
+            if tile is not None or loc in tilemap.tilemap:
+                journal.set_cell(tilemap, loc, tile)
+        journal.end_stroke()
+    edit = time.perf_counter() - start
+    entries = journal.size
+    start = time.perf_counter()
+    for _ in range(len(edits) - 1):
+        journal.undo(tilemap)
+    undo = time.perf_counter() - start
+    return edit * 1000 / len(edits), undo * 1000 / (len(edits) - 1), entries
+
+
+def main(count=50, length=12):
+    rows = []
+    # the map loader reports every file it reads
+    with contextlib.redirect_stdout(io.StringIO()):
+        maps = [("data/maps/0.json", "level 0")]
+        for width in (960, 3840):
+            path = os.path.join(tempfile.mkdtemp(), "stress.json")
+            save_map(path, width=width, seed=0)
+            maps.append((path, "generated " + str(width)))
+        for path, label in maps:
+            tilemap = Tilemap(None)
+            tilemap.load(path)
+            edits = strokes(tilemap, count, length)
+            rows.append((label, len(tilemap.tilemap)) + backup_ms(path, edits) + journal_ms(path, edits))
+
+    print(f"{'map':>16} {'tiles':>6} {'backup edit ms':>15} {'undo ms':>8} {'disk KB':>8} {'journal edit ms':>16} {'undo ms':>8} {'entries':>8}")
+    for label, tiles, backup_edit, backup_undo, size, edit, undo, entries in rows:
+        print(f"{label:>16} {tiles:>6} {backup_edit:>15.3f} {backup_undo:>8.3f} {size / 1024:>8.0f} {edit:>16.4f} {undo:>8.4f} {entries:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame
+
+from game import Game
+from scripts.replay import load_log
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def summarize(frames):
+    phases = {}
+    net_bytes = {}
+    for frame in frames:
+        phases.setdefault("total", []).append(frame["total"])
+        for name, seconds in frame["phases"].items():
+            phases.setdefault(name, []).append(seconds)
+        for name, size in frame.get("net_bytes", {}).items():
+            net_bytes[name] = net_bytes.get(name, 0) + size
+    summary = {}
+    for name, values in phases.items():
+        # phases that did not run on a frame count as zero so every phase shares the frame count
+        values = values + [0] * (len(frames) - len(values))
+        summary[name] = {
+            "p50": percentile(values, 50) * 1000,
+            "p95": percentile(values, 95) * 1000,
+            "p99": percentile(values, 99) * 1000,
+            "mean": sum(values) / len(values) * 1000,
+        }
+    return {
+        "frames": len(frames),
+        "ms": summary,
+        "net_kib_per_frame": {name: size / len(frames) / 1024 for name, size in net_bytes.items()},
+        "max_entities": max(frame["entities"] for frame in frames),
+        "max_particles": max(frame["particles"] for frame in frames),
+    }
+
+
+def play(level, replay, frames, seed, render, track_allocations):
+    if replay is not None:
+        replay.mismatch = None
+    game = Game(level, headless=True, seed=seed, replay=replay, render_frames=render)
+    game.profiler.enabled = True
+    game.profiler.track_allocations = track_allocations
+    game.profiler.frames = []
+    game.step(frames if replay is None else len(replay.hashes))
+    return game.profiler.frames
+
+
+def run_one(level=0, replay=None, frames=600, seed=0, render=True, allocations=True):
+    result = summarize(play(level, replay, frames, seed, render, False))
+    if replay is not None:
+        result["replay_matched"] = replay.mismatch is None
+    if allocations:
+        # a second, traced pass of the same deterministic run so tracing does not skew the timings
+        tracemalloc.start()
+        traced = summarize(play(level, replay, frames, seed, render, True))
+        tracemalloc.stop()
+        result["net_kib_per_frame"] = traced["net_kib_per_frame"]
+    return result
+
+
+def compare(results, baseline, threshold):
+    regressions = []
+    for run, summary in results["runs"].items():
+        old = baseline["runs"].get(run)
+        if not old:
+            continue
+        for phase, stats in summary["ms"].items():
+            old_stats = old["ms"].get(phase)
+            if not old_stats:
+                continue
+            # ignore sub-0.05ms noise on tiny phases
+            if stats["p95"] > old_stats["p95"] * (1 + threshold) and stats["p95"] - old_stats["p95"] > 0.05:
+                regressions.append((run, phase, old_stats["p95"], stats["p95"]))
+    return regressions
+
+
+def print_summary(run, summary):
+    print(f"{run}: {summary['frames']} frames, up to {summary['max_entities']} entities / {summary['max_particles']} particles")
+    print(f"  {'phase':<12} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'net KiB/f':>10}")
+    for phase, stats in sorted(summary["ms"].items(), key=lambda item: -item[1]["mean"]):
+        kib = summary["net_kib_per_frame"].get(phase, 0)
+        print(f"  {phase:<12} {stats['p50']:>8.3f} {stats['p95']:>8.3f} {stats['p99']:>8.3f} {kib:>10.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="replay-driven per-phase frame timings")
+    parser.add_argument("--replay", action="append", default=[], metavar="LOG", help="input log recorded with game.py --record")
+    parser.add_argument("--level", action="append", type=int, default=[], help="map id from data/maps, played with no input")
+    parser.add_argument("--frames", type=int, default=600, help="ticks per --level run")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-render", action="store_true", help="skip drawing, simulation phases only")
+    parser.add_argument("--no-allocs", action="store_true", help="skip the tracemalloc pass that measures net allocated bytes per phase")
+    parser.add_argument("--out", metavar="FILE", help="write results as JSON")
+    parser.add_argument("--compare", metavar="FILE", help="earlier --out file to check p95 regressions against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed p95 growth before flagging (default 10%%)")
+    args = parser.parse_args()
+
+    levels = args.level
+    if not levels and not args.replay:
+        # only the numbered maps are levels, as in scripts.levels.count_levels
+        levels = sorted(int(name[:-5]) for name in os.listdir("data/maps") if name.endswith(".json") and name[:-5].isdigit())
+
+    results = {
+        "meta": {"python": platform.python_version(), "pygame": pygame.version.ver, "render": not args.no_render},
+        "runs": {},
+    }
+    for level in levels:
+        results["runs"]["level-" + str(level)] = run_one(level, frames=args.frames, seed=args.seed, render=not args.no_render, allocations=not args.no_allocs)
+    for path in args.replay:
+        results["runs"]["replay-" + os.path.basename(path)] = run_one(replay=load_log(path), render=not args.no_render, allocations=not args.no_allocs)
+
+    for run, summary in results["runs"].items():
+        print_summary(run, summary)
+
+    if args.out:
+        f = open(args.out, "w")
+        json.dump(results, f, indent=1)
+        f.close()
+        print(args.out + " saved")
+
+    if args.compare:
+        f = open(args.compare, "r")
+        baseline = json.load(f)
+        f.close()
+        regressions = compare(results, baseline, args.threshold)
+        for run, phase, old, new in regressions:
+            print(f"REGRESSION {run} {phase}: p95 {old:.3f} ms -> {new:.3f} ms")
+        if regressions:
+            sys.exit(1)
+        print("no p95 regressions against " + args.compare)
+
+
+if __name__ == "__main__":
+    main()
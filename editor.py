@@ -2,13 +2,21 @@ import pygame  # type: ignore
 import sys
 import os
 
-from scripts.utils import load_images, display_msg, keys
+from scripts.utils import display_msg
+from scripts.constants import keys
+from scripts.registry import registry, EDITOR_ASSETS, EDITOR_BACKGROUNDS
 from scripts.tilemap import Tilemap
-from game import Game
+from scripts.journal import EditJournal
+from scripts.mapsaver import MapSaver
+from scripts.spatial import OffgridIndex
 
 RENDER_SCALE = 2.0
 SCREEN_WIDTH = 640
 SCREEN_HEIGHT = 480
+# how many cell and offgrid changes the undo history keeps before dropping its oldest strokes
+UNDO_LIMIT = 100000
+# ms between autosaves into .cache/autosave; a map that has not changed since its last save is skipped
+AUTOSAVE_INTERVAL = 30000
 
 
 class Editor:
@@ -23,21 +31,9 @@ class Editor:
 
         self.clock = pygame.time.Clock()
 
-        self.assets = {
-            "grass": load_images("tiles/grass"),
-            "herb": load_images("tiles/herb"),
-            "ice": load_images("tiles/ice"),
-            "stone": load_images("tiles/stone"),
-            "water": load_images("tiles/water"),
-            "spawners": load_images("tiles/spawners"),
-            "decor": load_images("tiles/decor"),
-            "large_decor": load_images("tiles/large_decor"),
-            "clouds": load_images("clouds"),
-            "demo": load_images("tiles/demo", color_key=(1, 1, 1)),
-            "colliders": load_images("tiles/colliders"),
-        }
-
-        self.backgrounds = load_images("backgrounds")
+        # the registry is shared with the Game started from the editor, so play-testing reuses these surfaces
+        self.assets, backgrounds = registry.preload("editor", EDITOR_ASSETS, EDITOR_BACKGROUNDS)
+        self.backgrounds = backgrounds["backgrounds"]
 
         self.movement = [False, False, False, False]
         self.speed = 2
@@ -55,13 +51,16 @@ class Editor:
         self.tile_list = list(self.assets)
         self.tile_group = 0
         self.tile_variant = 0
-        self.was_mod = 0
 
         self.clicking = 0
         self.right_clicking = False
         self.shift = False
         self.ongrid = True
         self.copying = False
+        # "rect" fills (left) or clears (right) the dragged rectangle, "copy" turns it into a stamp for V to paste
+        self.tool = None
+        self.drag_start = None
+        self.stamp = None
         self.background_scroll = 0
         self.player = 0
 
@@ -74,14 +73,16 @@ class Editor:
         )
         self.minimap_surface = pygame.Surface(self.minimap_size)
 
-        self.old_maps = []
-        self.back_amount = 100
-        self.back_count = 1
-        self.z_count = 0
-        self.tilemap.save(
-            "saved_maps/" + "0;" + str(self.level) + ".json",
-            self.background_scroll,
-        )
+        # every edit goes through the journal, which keeps just the changed cells for undo and redo
+        # the cursor tools look up offgrid tiles here instead of testing all of them every frame
+        self.offgrid_index = OffgridIndex({name: [img.get_size() for img in imgs] for name, imgs in self.assets.items()})
+        self.journal = EditJournal(UNDO_LIMIT, self.offgrid_index)
+        self.journal.reset(self.tilemap)
+        # the half-transparent copy of each palette tile drawn under the cursor
+        self.ghosts = {}
+        # saves are serialized and written on a worker thread, then swapped in whole
+        self.saver = MapSaver()
+        self.last_autosave = pygame.time.get_ticks()
 
     def draw_minimap(self):
         self.minimap_surface.fill((50, 50, 50))
@@ -91,6 +92,38 @@ class Editor:
         minimap_y = self.screen.get_height() - self.minimap_size[1] - 10
         self.screen.blit(self.minimap_surface, (minimap_x, minimap_y))
 
+    def ghost(self):
+        key = (self.tile_group, self.tile_variant)
+        if key not in self.ghosts:
+            img = self.assets[self.tile_list[self.tile_group]][self.tile_variant].copy()
+            img.set_alpha(150)
+            self.ghosts[key] = img
+        return self.ghosts[key]
+
+    def finish_drag(self, tile_pos, button):
+        if self.tool == "rect":
+            tile_type = self.tile_list[self.tile_group] if button == 1 else None
+            self.journal.apply(self.tilemap, self.tilemap.rect_cells(self.drag_start, tile_pos, tile_type, self.tile_variant, autotile=True))
+        elif self.tool == "copy":
+            self.stamp = self.tilemap.copy_region(self.drag_start, tile_pos)
+            self.tool = None
+        self.drag_start = None
+
+    def offgrid_under(self, mpos):
+        # offgrid tiles whose image covers the cursor
+        hits = []
+        for tile in self.offgrid_index.query_point((mpos[0] + self.scroll[0], mpos[1] + self.scroll[1])):
+            tile_img = self.assets[tile["type"]][tile["variant"]]
+            tile_r = pygame.Rect(
+                tile["pos"][0] - self.scroll[0],
+                tile["pos"][1] - self.scroll[1],
+                tile_img.get_width(),
+                tile_img.get_height(),
+            )
+            if tile_r.collidepoint(mpos):
+                hits.append(tile)
+        return hits
+
     def draw_clouds(self, pos, offset, depth, img, surf, altitude):
         render_pos = (
             pos[0] - offset[0] * depth,
@@ -107,17 +140,10 @@ class Editor:
     def run(self):
         while True:
 
-            if self.was_mod >= 2 and self.back_count < self.back_amount:
-                self.tilemap.save(
-                    "saved_maps/" + str(self.back_count) + ";" + str(self.level) + ".json",
-                    self.background_scroll,
-                )
-                self.back_count += 1
-                self.was_mod = 0
-                self.z_count += 1
-
-            if self.was_mod:
-                self.was_mod += 1
+            if pygame.time.get_ticks() - self.last_autosave >= AUTOSAVE_INTERVAL:
+                self.last_autosave = pygame.time.get_ticks()
+                name = "map.json" if self.level == -1 else str(self.level) + ".json"
+                self.saver.autosave(self.tilemap, name, self.background_scroll, self.journal.version)
 
             if self.clicking:
                 self.clicking += 2
@@ -137,8 +163,7 @@ class Editor:
 
             self.tilemap.render(self.display, offset=render_scroll)
 
-            current_tile_img = self.assets[self.tile_list[self.tile_group]][self.tile_variant].copy()
-            current_tile_img.set_alpha(150)
+            current_tile_img = self.ghost()
 
             mpos = pygame.mouse.get_pos()
             mpos = (mpos[0] / RENDER_SCALE, mpos[1] / RENDER_SCALE)
@@ -159,16 +184,20 @@ class Editor:
                 self.display.blit(current_tile_img, mpos)
 
             if self.clicking and self.ongrid:
-                self.tilemap.tilemap[str(tile_pos[0]) + ";" + str(tile_pos[1])] = {
-                    "type": self.tile_list[self.tile_group],
-                    "variant": self.tile_variant,
-                    "pos": tile_pos,
-                }
-                self.was_mod = 1
+                self.journal.set_cell(
+                    self.tilemap,
+                    str(tile_pos[0]) + ";" + str(tile_pos[1]),
+                    {
+                        "type": self.tile_list[self.tile_group],
+                        "variant": self.tile_variant,
+                        "pos": tile_pos,
+                    },
+                )
 
             elif self.clicking >= 10:
                 self.clicking = 1
-                self.tilemap.offgrid_tiles.append(
+                self.journal.add_offgrid(
+                    self.tilemap,
                     {
                         "type": self.tile_list[self.tile_group],
                         "variant": self.tile_variant,
@@ -176,33 +205,26 @@ class Editor:
                             mpos[0] + self.scroll[0],
                             mpos[1] + self.scroll[1],
                         ),
-                    }
+                    },
                 )
-                self.was_mod = 1
 
             if self.right_clicking:
-                for tile in self.tilemap.offgrid_tiles.copy():
-                    tile_img = self.assets[tile["type"]][tile["variant"]]
-                    cur_img = self.assets[self.tile_list[self.tile_group]][self.tile_variant]
-                    if self.shift and tile_img != cur_img:
-                        continue
-                    tile_r = pygame.Rect(
-                        tile["pos"][0] - self.scroll[0],
-                        tile["pos"][1] - self.scroll[1],
-                        tile_img.get_width(),
-                        tile_img.get_height(),
-                    )
-                    if tile_r.collidepoint(mpos):
-                        self.tilemap.offgrid_tiles.remove(tile)
-                        self.was_mod = 1
+                cur_img = self.assets[self.tile_list[self.tile_group]][self.tile_variant]
+                found = {id(tile) for tile in self.offgrid_under(mpos) if not self.shift or self.assets[tile["type"]][tile["variant"]] == cur_img}
+                # the list is only walked when something is erased, from the back so removing one does not move the rest
+                index = len(self.tilemap.offgrid_tiles)
+                while found and index:
+                    index -= 1
+                    if id(self.tilemap.offgrid_tiles[index]) in found:
+                        found.discard(id(self.tilemap.offgrid_tiles[index]))
+                        self.journal.remove_offgrid(self.tilemap, index)
 
                 tile_loc = str(tile_pos[0]) + ";" + str(tile_pos[1])
                 if tile_loc in self.tilemap.tilemap:
                     tile = self.tilemap.tilemap[tile_loc]
                     tile_img = self.assets[tile["type"]][tile["variant"]]
                     if not self.shift or tile_img == cur_img:
-                        del self.tilemap.tilemap[tile_loc]
-                        self.was_mod = 1
+                        self.journal.set_cell(self.tilemap, tile_loc, None)
 
             if self.copying:
                 tile_loc = str(tile_pos[0]) + ";" + str(tile_pos[1])
@@ -210,22 +232,34 @@ class Editor:
                 if tile_loc in self.tilemap.tilemap:
                     selected_tile = self.tilemap.tilemap[tile_loc]
                 if not selected_tile:
-                    for tile in self.tilemap.offgrid_tiles:
-                        tile_img = self.assets[tile["type"]][tile["variant"]]
-                        tile_r = pygame.Rect(
-                            tile["pos"][0] - self.scroll[0],
-                            tile["pos"][1] - self.scroll[1],
-                            tile_img.get_width(),
-                            tile_img.get_height(),
-                        )
-                        if tile_r.collidepoint(mpos):
-                            selected_tile = tile
-                            break
+                    hits = self.offgrid_under(mpos)
+                    if len(hits) > 1:
+                        # the first in draw order, as before; the index keeps insertion order, which undo can change
+                        found = {id(tile) for tile in hits}
+                        hits = [tile for tile in self.tilemap.offgrid_tiles if id(tile) in found]
+                    if hits:
+                        selected_tile = hits[0]
                 if selected_tile:
                     self.tile_group = self.tile_list.index(selected_tile["type"])
                     self.tile_variant = selected_tile["variant"]
                     self.copying = False
 
+            if self.drag_start:
+                tile_size = self.tilemap.tile_size
+                x0, y0 = min(self.drag_start[0], tile_pos[0]), min(self.drag_start[1], tile_pos[1])
+                x1, y1 = max(self.drag_start[0], tile_pos[0]), max(self.drag_start[1], tile_pos[1])
+                pygame.draw.rect(
+                    self.display,
+                    (255, 255, 255),
+                    pygame.Rect(
+                        x0 * tile_size - self.scroll[0],
+                        y0 * tile_size - self.scroll[1],
+                        (x1 - x0 + 1) * tile_size,
+                        (y1 - y0 + 1) * tile_size,
+                    ),
+                    1,
+                )
+
             self.display.blit(current_tile_img, (5, 5))
             for event in pygame.event.get():
                 pressed = pygame.key.get_pressed()
@@ -236,14 +270,17 @@ class Editor:
                         self.last_pressed_input = key
                         break
                 if event.type == pygame.QUIT:
-                    delete_saved_maps()
+                    self.saver.wait()
                     pygame.quit()
                     sys.exit()
                 if event.type == pygame.MOUSEBUTTONDOWN:
-                    if event.button == 1:
-                        self.clicking = True
-                    if event.button == 3:
-                        self.right_clicking = True
+                    if self.tool and event.button in (1, 3):
+                        self.drag_start = tile_pos
+                    else:
+                        if event.button == 1:
+                            self.clicking = True
+                        if event.button == 3:
+                            self.right_clicking = True
                     if self.shift:
                         if event.button == 4:
                             self.tile_variant = (self.tile_variant - 1) % len(self.assets[self.tile_list[self.tile_group]])
@@ -261,17 +298,18 @@ class Editor:
                         self.clicking = False
                     if event.button == 3:
                         self.right_clicking = False
+                    # one press of a button, however far it was dragged, is one step of undo
+                    if event.button in (1, 3):
+                        self.journal.end_stroke()
+                        if self.drag_start:
+                            self.finish_drag(tile_pos, event.button)
 
                 if event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_z:
                         if self.shift:
-                            files = os.listdir("saved_maps")
-                            self.z_count = min(len(files) - 1, self.z_count + 1)
+                            self.journal.redo(self.tilemap)
                         else:
-                            self.z_count = max(0, self.z_count - 1)
-
-                        load_saved_map(self, self.z_count)
-                        print(str(self.z_count))
+                            self.journal.undo(self.tilemap)
                     if event.key == pygame.K_LEFT:
                         self.background_scroll -= 1
                         if self.background_scroll < 0:
@@ -281,7 +319,7 @@ class Editor:
                         if self.background_scroll > len(self.backgrounds) - 1:
                             self.background_scroll = 0
                     if event.key == pygame.K_q:
-                        delete_saved_maps()
+                        self.saver.wait()
                         pygame.quit()
                         sys.exit()
                     if event.key == pygame.K_UP or event.key == pygame.K_DOWN:
@@ -290,12 +328,16 @@ class Editor:
                             self.level = -1
                         if self.level < -1:
                             self.level = len(os.listdir("data/maps")) - 1
+                        # a save still being written would otherwise be read back as the old map
+                        self.saver.wait()
                         if self.level == -1:
                             self.tilemap.load("map.json")
+                            self.journal.reset(self.tilemap)
                             pygame.display.set_caption("editor: map.json")
                         else:
                             try:
                                 bg_index = self.tilemap.load("data/maps/" + str(self.level) + ".json")
+                                self.journal.reset(self.tilemap)
                                 pygame.display.set_caption("editor: " + str(self.level) + ".json")
                                 self.scroll = [0, 0]
                                 self.background_scroll = bg_index
@@ -303,12 +345,35 @@ class Editor:
                                 print("data/maps/" + str(self.level) + ".json" + " not found")
                                 pass
                     if event.key == pygame.K_SPACE:
+                        # the game and every entity module are only loaded once a play-test is started
+                        from game import Game
+
+                        self.saver.wait()
                         game = Game(self.level)
                         game.run()
                         screen_width, screen_height = self.screen.get_size()
                         self.display = pygame.Surface((screen_width // 2, screen_height // 2), pygame.SRCALPHA)
                         self.display_2 = pygame.Surface((screen_width // 2, screen_height // 2))
 
+                    if event.key == pygame.K_r:
+                        self.tool = None if self.tool == "rect" else "rect"
+                        self.drag_start = None
+                    if event.key == pygame.K_c:
+                        self.tool = None if self.tool == "copy" else "copy"
+                        self.drag_start = None
+                    if event.key == pygame.K_v and self.stamp:
+                        cells, offgrid = self.tilemap.stamp_cells(self.stamp, tile_pos)
+                        self.journal.apply(self.tilemap, cells, offgrid)
+                    if event.key == pygame.K_f:
+                        # bounded by what is on screen, so filling open sky stops at the edges
+                        tile_size = self.tilemap.tile_size
+                        corner = (int(self.scroll[0] // tile_size), int(self.scroll[1] // tile_size))
+                        other = (
+                            int((self.scroll[0] + self.display.get_width()) // tile_size),
+                            int((self.scroll[1] + self.display.get_height()) // tile_size),
+                        )
+                        cells = self.tilemap.flood_cells(tile_pos, self.tile_list[self.tile_group], self.tile_variant, corner, other, autotile=True)
+                        self.journal.apply(self.tilemap, cells)
                     if event.key == pygame.K_i:
                         self.copying = True
                     if event.key == pygame.K_a:
@@ -323,23 +388,26 @@ class Editor:
                         self.ongrid = not self.ongrid
                     if event.key == pygame.K_x:
                         if display_msg(self, "clear map?") == pygame.K_SPACE:
-                            self.tilemap.offgrid_tiles.clear()
-                            self.tilemap.tilemap.clear()
+                            self.journal.clear(self.tilemap)
                     if event.key == pygame.K_t:
-                        self.tilemap.autotile()
+                        self.journal.autotile(self.tilemap)
                     if event.key == pygame.K_LSHIFT:
                         self.shift = True
                     if event.key == pygame.K_o:
                         if display_msg(self, "ADD TO GAME?") == pygame.K_SPACE:
                             if self.level != -1:
-                                self.tilemap.save(
+                                self.saver.save(
+                                    self.tilemap,
                                     "data/maps/" + str(self.level) + ".json",
                                     self.background_scroll,
+                                    self.journal.version,
                                 )
                             else:
-                                self.tilemap.save(
+                                self.saver.save(
+                                    self.tilemap,
                                     "map.json",
                                     self.background_scroll,
+                                    self.journal.version,
                                 )
                 if event.type == pygame.KEYUP:
                     if event.key == pygame.K_a:
@@ -366,36 +434,5 @@ class Editor:
             self.clock.tick(60)
 
 
-def load_saved_map(self, index=0):
-    directory_path = "saved_maps"
-    files = os.listdir(directory_path)
-
-    # Generate the expected file name pattern based on the index
-    expected_file_prefix = f"{index};"
-
-    # Find the file that starts with the expected prefix
-    try:
-        file_name = next(file for file in files if file.startswith(expected_file_prefix))
-        file_path = os.path.join(directory_path, file_name)
-        self.tilemap.load(file_path)
-        return 1
-    except StopIteration:
-        print(f"No file found for index {index}")
-        return 0
-    except Exception as e:
-        print(f"Error: {e}")
-        self.delete_saved_maps()
-        pygame.quit()
-        sys.exit()
-
-
-def delete_saved_maps():
-    directory_path = "saved_maps"
-    for filename in os.listdir(directory_path):
-        file_path = os.path.join(directory_path, filename)
-        if os.path.isfile(file_path):
-            os.remove(file_path)
-        print(f"{file_path} has been deleted.")
-
-
-Editor().run()
+if __name__ == "__main__":
+    Editor().run()
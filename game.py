@@ -1,101 +1,89 @@
 import pygame  # type: ignore
+import argparse
 import sys
 import random
 import math
 import time
 import os
 
-from scripts.utils import load_image, load_images, display_msg, Animation, keys, colors
+from scripts.utils import display_msg
+from scripts.constants import keys, colors
 from scripts.entities import Player, Enemy, Box, Bird, Mob, Demo
 from scripts.tilemap import Tilemap
+from scripts.levels import LevelPreloader, LevelSnapshot, level_path, count_levels
 from scripts.clouds import Clouds, Cloud
 from scripts.particle import Particle
 from scripts.spark import Spark
+from scripts.spatial import SpatialHash
+from scripts.activation import ActivationRegion
+from scripts.patrol import PatrolAI
+from scripts.flock import Flock
+from scripts.replay import InputLog, load_log, state_hash
+from scripts.profiler import Profiler
+from scripts.audio import Voices, SoundQueue
+from scripts.registry import registry, split_actions, GAME_ASSETS, GAME_SOUNDS
 
 scrn_mult = 2
 SCREEN_WIDTH = 640
 SCREEN_HEIGHT = 480
+# entities further than this from the camera centre sleep and only update every SLEEP_INTERVAL ticks
+ACTIVATION_RADIUS = 400
+SLEEP_INTERVAL = 30
 
 
 class Game:
-    def __init__(self, is_test=0):
+    def __init__(self, is_test=0, headless=False, seed=None, replay=None, record=None, render_frames=None, map_path=None):
+        # headless runs the simulation with SDL's dummy drivers, no rendering and no frame limiter;
+        # render_frames=True keeps drawing to off-screen surfaces, for benchmarks
+        self.headless = headless
+        self.render_frames = not headless if render_frames is None else render_frames
+        # every gameplay random draw goes through self.rng so a seed plus an input log reproduces a run
+        if replay:
+            is_test = replay.level
+            seed = replay.seed
+        if seed is None:
+            seed = random.randrange(2**32)
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.replay = replay
+        # map_path replaces data/maps for every load, e.g. a generated stress map
+        self.map_path = map_path
+        self.record_path = record
+        self.recording = InputLog(is_test, seed) if record else None
+        self.frame = 0
+        self.held_keys = set()
+        if headless:
+            os.environ["SDL_VIDEODRIVER"] = "dummy"
+            os.environ["SDL_AUDIODRIVER"] = "dummy"
         pygame.init()
 
         pygame.display.set_caption("ninja game")
-        if is_test:
-            SCREEN_WIDTH, SCREEN_HEIGHT = pygame.display.get_surface().get_size()
-        if is_test != -1:
-            scr_w, scr_h = pygame.display.get_surface().get_size()
+        surface = pygame.display.get_surface()
+        if surface:
+            scr_w, scr_h = surface.get_size()
         else:
             scr_w = SCREEN_WIDTH
             scr_h = SCREEN_HEIGHT
+        if replay and replay.size:
+            # the camera depends on the view size, so replays run at the recorded one
+            scr_w, scr_h = replay.size
         self.screen = pygame.display.set_mode((scr_w, scr_h), pygame.RESIZABLE)
         self.display = pygame.Surface((scr_w / 2, scr_h / 2), pygame.SRCALPHA)
         self.display_2 = pygame.Surface((scr_w / 2, scr_h / 2))
+        if self.recording:
+            self.recording.size = [scr_w, scr_h]
 
         self.clock = pygame.time.Clock()
 
         self.movement = [False, False]
 
-        self.assets = {
-            "colliders": load_images("tiles/colliders"),
-            "decor": load_images("tiles/decor"),
-            "grass": load_images("tiles/grass"),
-            "herb": load_images("tiles/herb"),
-            "large_decor": load_images("tiles/large_decor"),
-            "stone": load_images("tiles/stone"),
-            "water": load_images("tiles/water"),
-            "ice": load_images("tiles/ice"),
-            "player": load_image("entities/player.png"),
-            "demo": load_images("tiles/demo"),
-            "spawners": load_images("tiles/spawners", color_key=(255, 255, 255)),
-            "box": load_image("entities/box.png"),
-            "backgrounds": load_images("backgrounds"),
-            "clouds": load_images("clouds"),
-            "demo_surf/idle": Animation(load_images("demo/surf/idle"), img_dur=6),
-            "demo_hold/idle": Animation(load_images("demo/hold/idle"), img_dur=6),
-            "box/idle": Animation(load_images("entities/box/idle"), img_dur=6),
-            "box/destroy": Animation(load_images("entities/box/destroy"), img_dur=6),
-            "enemy/idle": Animation(load_images("entities/enemy/idle"), img_dur=6),
-            "enemy/run": Animation(load_images("entities/enemy/run"), img_dur=4),
-            "player/idle": Animation(load_images("entities/player/idle"), img_dur=6),
-            "player/hold": Animation(load_images("entities/player/hold"), img_dur=6),
-            "player/run": Animation(load_images("entities/player/run"), img_dur=4),
-            "player/jump": Animation(load_images("entities/player/jump"), img_dur=4, loop=False),
-            "player/slide": Animation(load_images("entities/player/slide")),
-            "player/wall_slide": Animation(load_images("entities/player/wall_slide")),
-            "player/deflect": Animation(load_images("entities/player/deflect")),
-            "player/powJump": Animation(load_images("entities/player/powJump")),
-            "player/attack": Animation(load_images("entities/player/attack"), img_dur=1, loop=False),
-            "player/swim": Animation(load_images("entities/player/swim"), img_dur=4),
-            "player/push": Animation(load_images("entities/player/push"), img_dur=4, loop=True),
-            "particle/leaf": Animation(load_images("particles/leaf"), img_dur=20, loop=False),
-            "particle/particle": Animation(load_images("particles/particle"), img_dur=6, loop=False),
-            "gun": load_image("gun.png"),
-            "projectile": load_image("projectile.png"),
-            "def_projectile": load_image("def_projectile.png"),
-            "bird/fly": Animation(load_images("entities/bird/fly"), img_dur=1),
-            "bird/fly_b": Animation(load_images("entities/bird/fly_b"), img_dur=1),
-            "bird/idle": Animation(load_images("entities/bird/idle")),
-            "mob/idle": Animation(load_images("entities/mob/idle", color_key=(20, 20, 20))),
-            "mob/run": Animation(load_images("entities/mob/run", color_key=(20, 20, 20))),
-        }
-        time.sleep(1)
-
-        self.sfx = {
-            "jump": pygame.mixer.Sound("data/sfx/jump.wav"),
-            "dash": pygame.mixer.Sound("data/sfx/dash.wav"),
-            "hit": pygame.mixer.Sound("data/sfx/hit.wav"),
-            "clonk": pygame.mixer.Sound("data/sfx/clonk.wav"),
-            "shoot": pygame.mixer.Sound("data/sfx/shoot.wav"),
-            "wind": pygame.mixer.Sound("data/sfx/wind.wav"),
-            "ambience": pygame.mixer.Sound("data/sfx/ambience.wav"),
-            "slash": pygame.mixer.Sound("data/sfx/slash.mp3"),
-            "parry": pygame.mixer.Sound("data/sfx/parry.mp3"),
-            "flight": pygame.mixer.Sound("data/sfx/flight.wav"),
-            "thump": pygame.mixer.Sound("data/sfx/thump.mp3"),
-        }
-        self.flight_sfx_pool = [pygame.mixer.Sound("data/sfx/flight.wav") for _ in range(200)]  # Create a pool of sounds
+        # opened once; draw_loading runs for every asset that finishes
+        self.loading_font = None if headless else pygame.font.Font(None, 20)
+        self.assets, self.sfx = registry.preload("game", GAME_ASSETS, GAME_SOUNDS, progress=None if headless else self.draw_loading)
+        self.animations = split_actions(self.assets)
+
+        self.voices = Voices()
+        self.sound_queue = SoundQueue(self.sfx, self.voices.one_shot_channels)
 
         self.sfx["clonk"].set_volume(1)
         self.sfx["jump"].set_volume(0.4)
@@ -113,6 +101,18 @@ class Game:
         self.player = Player(self, (50, 50), (8, 15))
 
         self.tilemap = Tilemap(self, tile_size=16)
+        self.box_grid = SpatialHash(cell_size=32)
+        self.enemy_grid = SpatialHash(cell_size=32)
+        self.activation = ActivationRegion(ACTIVATION_RADIUS, SLEEP_INTERVAL)
+        self.patrol = PatrolAI(self)
+        self.flock = Flock(self)
+        self.profiler = Profiler()
+        self.show_profiler = 0
+        # capturing (--profile, or O once pressed) is separate from the overlay, which only shows what is captured
+        self.capture_profile = 0
+        self.profiler_font = pygame.font.Font(None, 16)
+        # set by --profile; only then is the ring buffer written on exit
+        self.profile_path = None
 
         self.level = is_test
         self.is_test = is_test
@@ -123,26 +123,51 @@ class Game:
         self.has_paried = 0
         self.shift = 0
         self.player.alive = 1
-        self.fly_audio_index = 0
         self.menu = 0
+        self.running = 1
+        self.deaths = 0
+        self.clears = 0
+        self.levels = LevelPreloader()
+        self.last_level = count_levels() - 1
+        self.level_backgrounds = {}
+        self.snapshot = None
         self.load_level(self.level)
-        self.clouds = Clouds(self.tilemap, self.assets["clouds"])
+        self.clouds = Clouds(self.tilemap, self.assets["clouds"], rng=self.rng)
 
     def load_level(self, map_id):
         self.movement[0] = 0
         self.movement[1] = 0
+        # the old level's birds cannot land any more, so nothing else would stop their voices
+        self.voices.stop_all()
         label = "MAP TEST" if self.is_test else "ninja game Lv" + str(map_id)
         pygame.display.set_caption(label)
         self.background = 0
 
-        if self.is_test == -1:
-            self.background = self.tilemap.load("map.json")
+        path = self.level_file(map_id)
+        if self.snapshot and self.snapshot.path == path:
+            # a respawn (or clearing the last level again) puts the level back as it was first loaded
+            self.snapshot.restore(self)
         else:
-            self.background = self.tilemap.load("data/maps/" + str(map_id) + ".json")
-        print("LEVEL LOADED: data/maps/" + str(map_id) + ".json")
+            self.spawn_level(path)
+        print("LEVEL LOADED: " + (self.map_path or level_path(map_id)))
+
+        self.projectiles = []
+        self.particles = []
+        self.sparks = []
+        self.scroll = [0, 0]
+        self.dead = 0
+        self.transition = -30
+        self.timer = 0
+        self.levels.request(self.level_file(min(map_id + 1, self.last_level)))
+
+    def spawn_level(self, path):
+        # usually already parsed on the preloader thread while the previous level was played
+        level = self.levels.take(path)
+        self.tilemap.adopt(level.tilemap)
+        self.background = level.background
 
         self.leaf_spawners = []
-        for tree in self.tilemap.extract([("large_decor", 2)], keep=True):
+        for tree in level.leaf_trees:
             self.leaf_spawners.append(pygame.Rect(4 + tree["pos"][0], 4 + tree["pos"][1], 23, 13))
 
         self.birds = []
@@ -151,101 +176,118 @@ class Game:
         self.boxes = []
         self.demo_boards = []
 
-        for spawner in self.tilemap.extract(
-            [
-                ("spawners", 0),
-                ("spawners", 1),
-                ("spawners", 2),
-                ("spawners", 3),
-                ("spawners", 4),
-            ]
-        ):
+        spawned = []
+        for spawner in level.spawners:
             if spawner["variant"] == 0:
                 self.player.pos = spawner["pos"]
                 self.player.air_time = 0
             elif spawner["variant"] == 1:
                 self.enemies.append(Enemy(self, spawner["pos"], (8, 15)))
+                spawned.append((self.enemies[-1], spawner["pos"]))
             elif spawner["variant"] == 2:
                 self.boxes.append(Box(self, spawner["pos"], (10, 10)))
+                spawned.append((self.boxes[-1], spawner["pos"]))
             elif spawner["variant"] == 3:
-                self.birds.append(Bird(self, spawner["pos"], (18, 12), index=self.fly_audio_index))
-                self.fly_audio_index = self.fly_audio_index + 1
-                if self.fly_audio_index > len(self.flight_sfx_pool) - 1:
-                    self.fly_audio_index = 0
+                self.birds.append(Bird(self, spawner["pos"], (18, 12)))
+                spawned.append((self.birds[-1], spawner["pos"]))
             elif spawner["variant"] == 4:
                 self.mobs.append(Mob(self, spawner["pos"], (20, 16)))
+                spawned.append((self.mobs[-1], spawner["pos"]))
 
-        for demo in self.tilemap.extract(
-            [
-                ("demo", 0),
-                ("demo", 1),
-            ]
-        ):
+        for demo in level.demos:
             self.demo_boards.append(Demo(self, demo["pos"], (20, 16)))
-
-        self.projectiles = []
-        self.particles = []
-        self.sparks = []
-        self.scroll = [0, 0]
-        self.dead = 0
-        self.transition = -30
-        self.bg = self.assets["backgrounds"][self.background].copy().convert_alpha()
-        self.timer = 0
-
-    def run(self):
-        pygame.mixer.music.load("data/music.wav")
-        pygame.mixer.music.set_volume(0.5)
-        pygame.mixer.music.play(-1)
-
-        self.sfx["ambience"].play(-1)
-
-        running = 1
-        while running:
-
-            self.display.fill((0, 0, 0, 0))
-            SCREEN_WIDTH, SCREEN_HEIGHT = self.display_2.get_size()
-
-            self.display_2.blit(pygame.transform.scale(self.bg, (SCREEN_WIDTH, SCREEN_HEIGHT)), (0, 0))
-
-            self.player.pushing = 0
-
-            self.screenshake = max(0, self.screenshake - 1)
-
-            if not len(self.enemies):
-                self.transition += 1
-                if self.transition > 30:
-                    self.level = min(self.level + 1, len(os.listdir("data/maps")) - 1)
-                    self.load_level(self.level)
-            if self.transition < 0:
-                self.transition += 1
-
-            if self.has_paried:
+            spawned.append((self.demo_boards[-1], demo["pos"]))
+
+        self.snapshot = LevelSnapshot(self, path, spawned)
+
+    def level_background(self, index, size):
+        # converted and scaled once per view size instead of rescaling the full-size image every frame
+        key = (index, size)
+        if key not in self.level_backgrounds:
+            self.level_backgrounds[key] = pygame.transform.scale(self.assets["backgrounds"][index].convert_alpha(), size)
+        return self.level_backgrounds[key]
+
+    def prepare_next_level(self):
+        # called on the first frame of the fade-out; the swap itself then only adopts finished work
+        level = self.levels.ready(self.level_file(min(self.level + 1, self.last_level)))
+        if level and self.render_frames:
+            self.level_background(level.background, self.display_2.get_size())
+
+    def level_file(self, map_id):
+        if self.map_path:
+            return self.map_path
+        if self.is_test == -1:
+            return "map.json"
+        return level_path(map_id)
+
+    def step(self, ticks=1):
+        for _ in range(ticks):
+            self.tick()
+            if not self.running:
+                break
+
+    def tick(self):
+        render = self.render_frames
+        prof = self.profiler
+        prof.begin_frame()
+        with prof.section("background"):
+            if render:
+                self.display.fill((0, 0, 0, 0))
+                self.display_2.blit(self.level_background(self.background, self.display_2.get_size()), (0, 0))
+
+        self.player.pushing = 0
+
+        self.screenshake = max(0, self.screenshake - 1)
+
+        if not len(self.enemies):
+            self.transition += 1
+            if self.transition == 1:
+                self.prepare_next_level()
+            if self.transition > 30:
+                self.clears += 1
+                self.level = min(self.level + 1, self.last_level)
+                self.load_level(self.level)
+        if self.transition < 0:
+            self.transition += 1
+
+        if self.has_paried:
+            if not self.headless:
                 time.sleep(0.2)
-                self.has_paried = 0
-
-            if self.dead:
-                self.player.is_holding = 0
-                self.player.bul_surf = 0
-                self.player.is_swiming = 0
-                self.dead += 1
-                if self.dead >= 10:
-                    self.transition = min(30, self.transition + 1)
-                if self.dead > 40:
-                    self.load_level(self.level)
-
-            self.scroll[0] += (self.player.rect().centerx - self.display.get_width() / 2 - self.scroll[0]) / 20
-            self.scroll[1] += (self.player.rect().centery - self.display.get_height() / 2 - self.scroll[1]) / 20
-            render_scroll = (int(self.scroll[0]), int(self.scroll[1]))
+            self.has_paried = 0
+
+        if self.dead:
+            self.player.is_holding = 0
+            self.player.bul_surf = 0
+            self.player.is_swiming = 0
+            self.dead += 1
+            if self.dead >= 10:
+                self.transition = min(30, self.transition + 1)
+            if self.dead > 40:
+                self.deaths += 1
+                self.load_level(self.level)
+
+        self.scroll[0] += (self.player.rect().centerx - self.display.get_width() / 2 - self.scroll[0]) / 20
+        self.scroll[1] += (self.player.rect().centery - self.display.get_height() / 2 - self.scroll[1]) / 20
+        render_scroll = (int(self.scroll[0]), int(self.scroll[1]))
+        view_size = self.display.get_size()
+        self.activation.begin_tick((self.scroll[0] + view_size[0] / 2, self.scroll[1] + view_size[1] / 2), view_size)
+        self.sound_queue.begin((self.scroll[0] + view_size[0] / 2, self.scroll[1] + view_size[1] / 2), view_size[0] / 2)
+        is_awake = self.activation.is_awake
+
+        with prof.section("entities"):
+            self.box_grid.rebuild(self.boxes)
 
             for demo in self.demo_boards:
                 demo.update(self.tilemap, (0, 0))
-                demo.render(self.display, offset=render_scroll)
+                if render:
+                    demo.render(self.display, offset=render_scroll)
 
+        with prof.section("particles"):
             for rect in self.leaf_spawners:
-                if random.random() * 49999 < rect.width * rect.height:
+                if self.rng.random() * 49999 < rect.width * rect.height:
                     pos = (
-                        rect.x + random.random() * rect.width,
-                        rect.y + random.random() * rect.height,
+                        rect.x + self.rng.random() * rect.width,
+                        rect.y + self.rng.random() * rect.height,
                     )
                     self.particles.append(
                         Particle(
@@ -253,25 +295,33 @@ class Game:
                             "leaf",
                             pos,
                             velocity=[-0, 1, 0.3],
-                            frame=random.randint(0, 20),
+                            frame=self.rng.randint(0, 20),
                         )
                     )
 
-            self.clouds.update()
-            self.clouds.render(self.display_2, offset=render_scroll)
+        self.clouds.update()
+        if render:
+            with prof.section("clouds"):
+                self.clouds.render(self.display_2, offset=render_scroll)
 
-            self.tilemap.render(self.display, offset=self.scroll, include="all", exclude="herb")
+            with prof.section("tilemap"):
+                self.tilemap.render(self.display, offset=self.scroll, include="all", exclude="herb", profiler=self.profiler)
 
-            x = 0
-            for dstr in self.boxes.copy():
-                x += 1
+        with prof.section("entities"):
+            for i, dstr in enumerate(self.boxes.copy()):
+                # held boxes follow the player wherever it goes
+                if not (dstr.is_held or is_awake(dstr, i)):
+                    continue
                 kill = dstr.update(self.tilemap, (0, 0))
-                dstr.render(self.display, offset=render_scroll)
+                if render:
+                    dstr.render(self.display, offset=render_scroll)
                 if kill:
                     self.boxes.remove(dstr)
-            for enemy in self.enemies.copy():
-                kill = enemy.update(self.tilemap, (0, 0))
-                enemy.render(self.display, offset=render_scroll)
+            awake_enemies = [enemy for i, enemy in enumerate(self.enemies) if is_awake(enemy, i)]
+            for enemy, movement in zip(awake_enemies, self.patrol.step(awake_enemies, self.tilemap)):
+                kill = enemy.update(self.tilemap, movement)
+                if render:
+                    enemy.render(self.display, offset=render_scroll)
                 if kill:
                     self.enemies.remove(enemy)
 
@@ -282,7 +332,11 @@ class Game:
                 mov_y = self.movement[1] * max(self.shift, 1)
 
                 self.player.update(self.tilemap, (mov_y - mov_x, 0))
-                self.player.render(self.display, offset=(render_scroll[0], render_scroll[1] - 1))
+                if render:
+                    self.player.render(self.display, offset=(render_scroll[0], render_scroll[1] - 1))
+
+        with prof.section("projectiles"):
+            self.enemy_grid.rebuild(self.enemies)
 
             # [x,y], direction, timer, is_redirected]
             for projectile in self.projectiles.copy():
@@ -296,8 +350,8 @@ class Game:
                         self.sparks.append(
                             Spark(
                                 projectile[0],
-                                random.random() - 0.5 + (math.pi if projectile[1] > 0 else 0),
-                                2 + random.random(),
+                                self.rng.random() - 0.5 + (math.pi if projectile[1] > 0 else 0),
+                                2 + self.rng.random(),
                             )
                         )
 
@@ -305,8 +359,8 @@ class Game:
                     removed = 1
                 elif projectile[3] > 0:
                     for i in range(2):
-                        angle = random.random() * math.pi * 2
-                        speed = random.random() * 0.5 + 0.5
+                        angle = self.rng.random() * math.pi * 2
+                        speed = self.rng.random() * 0.5 + 0.5
                         pvelocity = [math.cos(angle) * speed, math.sin(angle) * speed]
                         self.particles.append(
                             Particle(
@@ -314,7 +368,7 @@ class Game:
                                 "particle",
                                 (projectile[0][0], projectile[0][1]),
                                 velocity=pvelocity,
-                                frame=random.randint(0, 7),
+                                frame=self.rng.randint(0, 7),
                             )
                         )
                     if self.player.deflecting:
@@ -330,7 +384,7 @@ class Game:
                                 self.player.pos[0] -= (self.player.pos[0] - end_pos[0]) * 0.2
                                 self.player.pos[1] -= (self.player.pos[1] - end_pos[1]) * 0.2
 
-                                self.particles.append(Particle(self, "particle", self.player.rect().center, velocity=(0.3, 0.3), frame=random.randint(0, 7)))
+                                self.particles.append(Particle(self, "particle", self.player.rect().center, velocity=(0.3, 0.3), frame=self.rng.randint(0, 7)))
                                 self.player.is_swiming = 1
 
                                 if abs(self.player.pos[0] - projectile[0][0]) < 15:
@@ -346,7 +400,7 @@ class Game:
                             self.player.attacking = 0
                             self.player.bul_surf += 1
                     else:
-                        for enemy in self.enemies:
+                        for enemy in self.enemy_grid.query_point(projectile[0]):
                             if enemy.rect().collidepoint(projectile[0]):
                                 removed = 1
                                 enemy.alive = 0
@@ -355,22 +409,22 @@ class Game:
                         if self.player.attacking:
                             projectile[1] *= -1
                             projectile[0][0] += 5
-                            self.sfx["parry"].play()
+                            self.sound_queue.emit("parry")
                             self.has_paried = 1
                             projectile[3] = 1
                         else:
-                            self.sfx["hit"].play()
+                            self.sound_queue.emit("hit")
                             removed = 1
                             self.dead += 1
                             self.screenshake = max(16, self.screenshake)
                         for i in range(5 if projectile[3] else 30):
-                            angle = random.random() * math.pi * 2
-                            speed = random.random() * 5
+                            angle = self.rng.random() * math.pi * 2
+                            speed = self.rng.random() * 5
                             self.sparks.append(
                                 Spark(
                                     self.player.rect().center,
                                     angle,
-                                    2 + random.random(),
+                                    2 + self.rng.random(),
                                 )
                             )
                             self.particles.append(
@@ -382,7 +436,7 @@ class Game:
                                         math.cos(angle + math.pi) * speed * 0.5,
                                         math.sin(angle + math.pi) * speed * 0.5,
                                     ],
-                                    frame=random.randint(0, 7),
+                                    frame=self.rng.randint(0, 7),
                                 )
                             )
                 if removed:
@@ -390,7 +444,7 @@ class Game:
                     if projectile == self.player.pos and self.player.bul_surf > 10:
                         self.player.bul_surf = 0
 
-                else:
+                elif render:
                     img = self.assets["def_projectile" if projectile[3] else "projectile"]
                     self.display.blit(
                         img,
@@ -400,86 +454,100 @@ class Game:
                         ),
                     )
 
+        with prof.section("sparks"):
             for spark in self.sparks.copy():
                 kill = spark.update()
-                spark.render(self.display, offset=render_scroll)
+                if render:
+                    spark.render(self.display, offset=render_scroll)
                 if kill:
                     self.sparks.remove(spark)
 
-            display_mask = pygame.mask.from_surface(self.display)
-            display_silhouette = display_mask.to_surface(setcolor=(0, 0, 0, 80), unsetcolor=(0, 0, 0, 0))
+        with prof.section("outline"):
+            if render:
+                display_mask = pygame.mask.from_surface(self.display)
+                display_silhouette = display_mask.to_surface(setcolor=(0, 0, 0, 80), unsetcolor=(0, 0, 0, 0))
 
-            for offset in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-                self.display_2.blit(display_silhouette, offset)
+                for offset in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
+                    self.display_2.blit(display_silhouette, offset)
+        with prof.section("particles"):
             for particle in self.particles.copy():
                 kill = particle.update()
-                particle.render(self.display, offset=render_scroll)
+                if render:
+                    particle.render(self.display, offset=render_scroll)
                 if particle.type == "leaf":
                     particle.pos[0] += math.sin(particle.animation.frame * 0.035) * 0.3
                 if kill:
                     self.particles.remove(particle)
 
-            self.player.deflecting = 0
-            self.player.bul_surf = max(self.player.bul_surf - 1, 0)
-            self.tilemap.render(self.display, offset=self.scroll, include="herb", exclude="all")
-
-            for event in pygame.event.get():
-                pressed = pygame.key.get_pressed()
+        self.player.deflecting = 0
+        self.player.bul_surf = max(self.player.bul_surf - 1, 0)
+        if render:
+            with prof.section("tilemap"):
+                self.tilemap.render(self.display, offset=self.scroll, include="herb", exclude="all", profiler=self.profiler)
+
+        with prof.section("events"):
+            for event_type, value in self.poll_input():
+                if event_type == pygame.KEYDOWN:
+                    self.held_keys.add(value)
+                elif event_type == pygame.KEYUP:
+                    self.held_keys.discard(value)
                 self.last_pressed_input = 0
 
                 for action, key in keys.items():
-                    if pressed[key]:
+                    if key in self.held_keys:
                         self.last_pressed_input = key
                         break
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
-                if event.type == pygame.KEYDOWN:
+                if event_type == pygame.KEYDOWN:
                     self.last_input = self.input
                     self.last_pressed_input = self.last_input
-                    self.input = event.key
+                    self.input = value
 
-                    if event.key == keys["quit"]:
-                        running = 0
+                    if value == keys["quit"]:
+                        self.running = 0
                     if self.dead:
                         break
-                    if event.key == keys["attack"]:
+                    if value == keys["attack"]:
                         self.player.attack()
 
-                    if event.key == pygame.K_LSHIFT:
+                    if value == pygame.K_LSHIFT:
                         self.shift = 0.1
-                    if event.key == keys["surf"]:
+                    if value == keys["surf"]:
                         self.player.deflecting = 1
-                    if event.key == keys["menu"]:
+                    if value == keys["menu"]:
                         self.menu = not self.menu
-                    if event.key == keys["mv_left"]:
+                    if value == keys["profiler"]:
+                        self.show_profiler = not self.show_profiler
+                        self.profiler.enabled = self.capture_profile or self.show_profiler
+                    if value == keys["profiler_dump"]:
+                        self.profiler.export(self.profile_path or "profile.jsonl")
+                        self.capture_profile = 1
+                        self.profiler.enabled = True
+                    if value == keys["mv_left"]:
                         self.movement[0] = True
-                    if event.key == keys["mv_right"]:
+                    if value == keys["mv_right"]:
                         self.movement[1] = True
-                    if event.key == keys["jump"]:
+                    if value == keys["jump"]:
                         if self.player.jump():
-                            self.sfx["jump"].play()
-                    if event.key == keys["mv_down"]:
+                            self.sound_queue.emit("jump")
+                    if value == keys["mv_down"]:
                         if self.player.action == "jump":
                             self.player.power_jump()
-                    if event.key == keys["dash"]:
+                    if value == keys["dash"]:
                         self.player.dash()
-                if event.type == pygame.VIDEORESIZE:
-                    SCREEN_WIDTH, SCREEN_HEIGHT = event.w, event.h
-                    self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.RESIZABLE)
-                    self.display = pygame.Surface((SCREEN_WIDTH / 2, SCREEN_HEIGHT / 2), pygame.SRCALPHA)
-                    self.display_2 = pygame.Surface((SCREEN_WIDTH / 2, SCREEN_HEIGHT / 2))
+                if event_type == pygame.VIDEORESIZE:
+                    self.resize(value)
                 if self.dead:
                     break
-                if event.type == pygame.KEYUP:
-                    if event.key == pygame.K_LSHIFT:
+                if event_type == pygame.KEYUP:
+                    if value == pygame.K_LSHIFT:
                         self.shift = 0
-                    if event.key == keys["mv_left"]:
+                    if value == keys["mv_left"]:
                         self.movement[0] = False
-                    if event.key == keys["mv_right"]:
+                    if value == keys["mv_right"]:
                         self.movement[1] = False
 
-            if self.transition:
+        with prof.section("transition"):
+            if render and self.transition:
                 transition_surf = pygame.Surface(self.display.get_size())
                 pygame.draw.circle(
                     transition_surf,
@@ -492,23 +560,102 @@ class Game:
                 )
                 transition_surf.set_colorkey((255, 255, 255))
                 self.display.blit(transition_surf, (0, 0))
-            screenshake_offset = random.random() * self.screenshake - self.screenshake / 2
+        screenshake_offset = self.rng.random() * self.screenshake - self.screenshake / 2
+        if render:
             self.display_2.blit(self.display, (0, 0))
 
-            for bird in self.birds.copy():
+        with prof.section("entities"):
+            awake_birds = [bird for i, bird in enumerate(self.birds) if is_awake(bird, i)]
+            self.flock.step(awake_birds)
+            for bird in awake_birds:
                 kill = bird.update(self.tilemap, (0, 0))
-                bird.render(self.display_2, offset=render_scroll)
+                if render:
+                    bird.render(self.display_2, offset=render_scroll)
                 if kill:
                     self.birds.remove(bird)
+            self.flock.flush_audio()
+
+            awake_mobs = [mob for i, mob in enumerate(self.mobs) if is_awake(mob, i)]
+            for mob, movement in zip(awake_mobs, self.patrol.step(awake_mobs, self.tilemap)):
+                kill = mob.update(self.tilemap, movement)
+                if render:
+                    mob.render(self.display_2, offset=render_scroll)
+            self.sound_queue.flush()
+
+        if self.recording or self.replay:
+            current_hash = state_hash(self)
+            if self.recording:
+                self.recording.hashes.append(current_hash)
+            if self.replay:
+                self.replay.check(self.frame, current_hash)
+        self.frame += 1
+        if self.replay and self.replay.finished(self.frame):
+            self.running = 0
+
+        if render:
+            with prof.section("scale"):
+                self.screen.blit(
+                    pygame.transform.scale(self.display_2, self.screen.get_size()),
+                    (screenshake_offset, screenshake_offset),
+                )
+            if self.show_profiler:
+                prof.render(self.screen, self.profiler_font)
+        prof.end_frame(
+            entities=len(self.boxes) + len(self.enemies) + len(self.birds) + len(self.mobs),
+            particles=len(self.particles),
+            sparks=len(self.sparks),
+            projectiles=len(self.projectiles),
+        )
+
+    def poll_input(self):
+        # returns this tick's (event_type, value) input, live or from the replay log
+        events = []
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                # leave through the end of run(), which saves the recording and the profile
+                self.running = 0
+                return []
+            if self.replay:
+                continue
+            if event.type in (pygame.KEYDOWN, pygame.KEYUP):
+                events.append((event.type, event.key))
+            elif event.type == pygame.VIDEORESIZE:
+                events.append((event.type, (event.w, event.h)))
+        if self.replay:
+            events = self.replay.events_at(self.frame)
+        if self.recording:
+            for event_type, value in events:
+                self.recording.record(self.frame, event_type, value)
+        return events
+
+    def draw_loading(self, done, total):
+        pygame.event.pump()
+        width, height = self.screen.get_size()
+        bar = pygame.Rect(width // 4, height // 2 - 4, width // 2, 8)
+        self.screen.fill((0, 0, 0))
+        pygame.draw.rect(self.screen, colors["DARK_GRAY"], bar)
+        pygame.draw.rect(self.screen, colors["WHITE"], (bar.x, bar.y, bar.width * done // max(total, 1), bar.height))
+        text = self.loading_font.render("loading " + str(done) + "/" + str(total), True, colors["WHITE"])
+        self.screen.blit(text, (bar.x, bar.y - text.get_height() - 4))
+        pygame.display.update()
+
+    def resize(self, size):
+        self.screen = pygame.display.set_mode(size, pygame.RESIZABLE)
+        self.display = pygame.Surface((size[0] / 2, size[1] / 2), pygame.SRCALPHA)
+        self.display_2 = pygame.Surface((size[0] / 2, size[1] / 2))
+
+    def run(self):
+        pygame.mixer.music.load("data/music.wav")
+        pygame.mixer.music.set_volume(0.5)
+        pygame.mixer.music.play(-1)
 
-            for mob in self.mobs.copy():
-                kill = mob.update(self.tilemap, (0, 0))
-                mob.render(self.display_2, offset=render_scroll)
+        self.sfx["ambience"].play(-1)
 
-            self.screen.blit(
-                pygame.transform.scale(self.display_2, self.screen.get_size()),
-                (screenshake_offset, screenshake_offset),
-            )
+        self.running = 1
+        while self.running:
+            self.tick()
+            if self.headless:
+                continue
             pygame.display.update()
             self.clock.tick(60)
             if self.menu:
@@ -517,6 +664,10 @@ class Game:
 
         pygame.mixer.stop()
         pygame.mixer.music.stop()
+        if self.recording:
+            self.recording.save(self.record_path)
+        if self.profile_path and self.profiler.frames:
+            self.profiler.export(self.profile_path)
 
 
 def in_menu(self):
@@ -564,5 +715,30 @@ def auto_run():
     Game().run()
 
 
+def main():
+    parser = argparse.ArgumentParser(description="ninja game")
+    parser.add_argument("--level", type=int, default=0)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--map", metavar="PATH", help="play a map json instead of data/maps, e.g. one from scripts.mapgen")
+    parser.add_argument("--headless", action="store_true")
+    parser.add_argument("--record", metavar="LOG", help="save a replayable input log to LOG on exit")
+    parser.add_argument("--replay", metavar="LOG", help="play back an input log and check its state hashes")
+    parser.add_argument("--profile", metavar="OUT", help="profile every frame and dump the ring buffer to OUT (.csv or .jsonl) on exit")
+    args = parser.parse_args()
+
+    replay = load_log(args.replay) if args.replay else None
+    game = Game(args.level, headless=args.headless, seed=args.seed, replay=replay, record=args.record, map_path=args.map)
+    if args.profile:
+        game.capture_profile = 1
+        game.profiler.enabled = True
+        game.profile_path = args.profile
+    game.run()
+    if replay:
+        if replay.mismatch is None:
+            print("replay matched " + str(game.frame) + " frames")
+        else:
+            sys.exit(1)
+
+
 if __name__ == "__main__":
-    auto_run()
+    main()
@@ -0,0 +1,27 @@
+import math
+
+
+class ActivationRegion:
+    def __init__(self, radius=400, sleep_interval=30):
+        self.radius = radius
+        self.sleep_interval = sleep_interval
+        self.center = (0, 0)
+        self.radius_sq = radius * radius
+        self.tick = 0
+
+    def begin_tick(self, center, view_size):
+        # never let the region shrink inside the visible area, sleepers are not rendered
+        radius = max(self.radius, math.hypot(view_size[0], view_size[1]) / 2 + 32)
+        self.radius_sq = radius * radius
+        self.center = center
+        self.tick += 1
+
+    def is_awake(self, entity, index=0):
+        dx = entity.pos[0] - self.center[0]
+        dy = entity.pos[1] - self.center[1]
+        # dead entities (e.g. hit by a projectile) always wake so they can play out and be removed
+        if dx * dx + dy * dy <= self.radius_sq or entity.alive <= 0:
+            return True
+        if self.sleep_interval:
+            return (self.tick + index) % self.sleep_interval == 0
+        return False
@@ -0,0 +1,116 @@
+import atexit
+import hashlib
+import json
+import mmap
+import os
+import struct
+import threading
+
+import pygame
+
+CACHE_DIR = ".cache/assets"
+IMAGE_HEADER = struct.Struct("<4sII")
+IMAGE_MAGIC = b"NJI1"
+
+
+class AssetCache:
+    # pre-decoded pixels and PCM on disk, keyed by the source's content hash.
+    # the index remembers path -> (mtime, size, hash) so unchanged files are not even re-hashed
+    def __init__(self, directory=CACHE_DIR):
+        self.directory = directory
+        self.index = None
+        self.dirty = False
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def load_index(self):
+        # deferred to the first load so importing this module never touches the disk
+        with self.lock:
+            if self.index is not None:
+                return
+            os.makedirs(self.directory, exist_ok=True)
+            try:
+                f = open(os.path.join(self.directory, "index.json"), "r")
+                self.index = json.load(f)
+                f.close()
+            except (OSError, ValueError):
+                self.index = {}
+
+    def digest(self, path):
+        if self.index is None:
+            self.load_index()
+        stat = os.stat(path)
+        entry = self.index.get(path)
+        if entry and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size:
+            return entry[2]
+        f = open(path, "rb")
+        digest = hashlib.sha1(f.read()).hexdigest()
+        f.close()
+        with self.lock:
+            self.index[path] = [stat.st_mtime_ns, stat.st_size, digest]
+            self.dirty = True
+        return digest
+
+    def read(self, name):
+        try:
+            f = open(os.path.join(self.directory, name), "rb")
+        except FileNotFoundError:
+            return None
+        try:
+            # the surface or sound made from the map keeps it alive; it is never written to
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            return None
+        finally:
+            f.close()
+        return memoryview(data)
+
+    def write(self, name, chunks):
+        path = os.path.join(self.directory, name)
+        tmp = path + "." + str(threading.get_ident()) + ".tmp"
+        f = open(tmp, "wb")
+        for chunk in chunks:
+            f.write(chunk)
+        f.close()
+        os.replace(tmp, path)
+
+    def load_surface(self, path):
+        if not self.directory:
+            return pygame.image.load(path)
+        name = self.digest(path) + ".rgba"
+        data = self.read(name)
+        if data is not None:
+            self.hits += 1
+            _, width, height = IMAGE_HEADER.unpack(data[: IMAGE_HEADER.size])
+            return pygame.image.frombuffer(data[IMAGE_HEADER.size :], (width, height), "RGBA")
+        self.misses += 1
+        img = pygame.image.load(path)
+        width, height = img.get_size()
+        self.write(name, [IMAGE_HEADER.pack(IMAGE_MAGIC, width, height), pygame.image.tobytes(img, "RGBA")])
+        return img
+
+    def load_sound(self, path):
+        if not self.directory:
+            return pygame.mixer.Sound(path)
+        # PCM layout follows the mixer settings, so they are part of the key
+        frequency, size, channels = pygame.mixer.get_init()
+        name = self.digest(path) + "-" + str(frequency) + "_" + str(size) + "_" + str(channels) + ".pcm"
+        data = self.read(name)
+        if data is not None:
+            self.hits += 1
+            return pygame.mixer.Sound(buffer=data)
+        self.misses += 1
+        sound = pygame.mixer.Sound(path)
+        self.write(name, [sound.get_raw()])
+        return sound
+
+    def save(self):
+        if self.directory and self.dirty:
+            with self.lock:
+                self.write("index.json", [json.dumps(self.index).encode()])
+                self.dirty = False
+
+
+cache = AssetCache()
+atexit.register(cache.save)
@@ -0,0 +1,128 @@
+import pygame
+
+VOICE_CHANNELS = 16
+ONE_SHOT_CHANNELS = 8
+FREE_CHANNELS = 8
+
+
+class Voices:
+    # a fixed set of reserved mixer channels shared by every emitter; each sound is decoded once by the caller
+    def __init__(self, channels=VOICE_CHANNELS, one_shots=ONE_SHOT_CHANNELS, free=FREE_CHANNELS):
+        # the first `channels` channels are reserved for voices and the next `one_shots` for SoundQueue, which pans them.
+        # plain Sound.play() keeps using the rest, so it never picks up a pan left on a channel
+        pygame.mixer.set_num_channels(channels + one_shots + free)
+        pygame.mixer.set_reserved(channels + one_shots)
+        self.channels = [pygame.mixer.Channel(i) for i in range(channels)]
+        self.one_shot_channels = [pygame.mixer.Channel(i) for i in range(channels, channels + one_shots)]
+        self.owners = [None] * channels
+        self.priorities = [0] * channels
+        self.started = [0] * channels
+        self.by_emitter = {}
+        self.count = 0
+
+    def play(self, sound, emitter=None, priority=0, loops=0):
+        # takes a free channel, else steals the oldest voice of the lowest priority not above this one
+        self.count += 1
+        channels = self.channels
+        index = None
+        for i, channel in enumerate(channels):
+            if not channel.get_busy():
+                index = i
+                break
+        if index is None:
+            index = min(range(len(channels)), key=lambda i: (self.priorities[i], self.started[i]))
+            if self.priorities[index] > priority:
+                return None
+        self.release(index)
+        channels[index].play(sound, loops)
+        self.owners[index] = emitter
+        self.priorities[index] = priority
+        self.started[index] = self.count
+        if emitter is not None:
+            self.by_emitter[emitter] = index
+        return index
+
+    def stop(self, emitter):
+        # only stops the emitter's own voice, a stolen channel is left to its new owner
+        index = self.by_emitter.pop(emitter, None)
+        if index is not None and self.owners[index] is emitter:
+            self.channels[index].stop()
+            self.owners[index] = None
+
+    def release(self, index):
+        owner = self.owners[index]
+        if owner is not None and self.by_emitter.get(owner) == index:
+            del self.by_emitter[owner]
+        self.owners[index] = None
+
+    def stop_all(self):
+        for channel in self.channels:
+            channel.stop()
+        self.owners = [None] * len(self.channels)
+        self.by_emitter.clear()
+
+
+# emitters further than this from the camera centre are not heard, closer than HEARING_FULL they play at full volume
+HEARING_FULL = 200
+HEARING_MAX = 400
+
+
+class SoundQueue:
+    # one-shot effects requested during a tick; flush() plays each name once, from its closest emitter, on its own channels
+    def __init__(self, sfx, channels):
+        self.sfx = sfx
+        # least recently started first
+        self.channels = list(channels)
+        self.pending = {}
+        self.center = (0, 0)
+        self.half_width = 160
+        self.requested = 0
+        self.played = 0
+
+    def begin(self, center, half_width):
+        self.center = center
+        self.half_width = half_width
+
+    def emit(self, name, pos=None):
+        # pos is a world position; None is always heard centred, for the player and ui sounds
+        self.requested += 1
+        if name not in self.pending:
+            self.pending[name] = pos
+            return
+        queued = self.pending[name]
+        if queued is not None and (pos is None or self.distance_sq(pos) < self.distance_sq(queued)):
+            self.pending[name] = pos
+
+    def distance_sq(self, pos):
+        dx = pos[0] - self.center[0]
+        dy = pos[1] - self.center[1]
+        return dx * dx + dy * dy
+
+    def flush(self):
+        for name, pos in self.pending.items():
+            left = right = 1.0
+            if pos is not None:
+                dist = self.distance_sq(pos) ** 0.5
+                if dist > HEARING_MAX:
+                    continue
+                gain = 1.0 if dist < HEARING_FULL else 1 - (dist - HEARING_FULL) / (HEARING_MAX - HEARING_FULL)
+                pan = max(-1.0, min(1.0, (pos[0] - self.center[0]) / self.half_width))
+                left = gain * min(1.0, 1 - pan)
+                right = gain * min(1.0, 1 + pan)
+            channel = self.channel()
+            channel.play(self.sfx[name])
+            channel.set_volume(left, right)
+            self.played += 1
+        self.pending.clear()
+
+    def channel(self):
+        # an idle channel, else the one that started longest ago
+        channels = self.channels
+        index = 0
+        for i, channel in enumerate(channels):
+            if not channel.get_busy():
+                index = i
+                break
+        channel = channels.pop(index)
+        channels.append(channel)
+        return channel
@@ -0,0 +1,169 @@
+import argparse
+import gc
+import json
+import multiprocessing
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SOAK_ACTIONS = ["mv_left", "mv_right", "jump", "dash", "attack", "grab"]
+
+
+def init_worker():
+    # every worker owns its own SDL state; asset paths are relative to the repo root
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
+    os.environ["SDL_AUDIODRIVER"] = "dummy"
+    # SDL otherwise turns SIGTERM into a QUIT event, and Pool.terminate() would wait on idle workers forever
+    os.environ["SDL_NO_SIGNAL_HANDLERS"] = "1"
+    os.chdir(ROOT)
+    # level loads print on every respawn, the report carries what matters
+    sys.stdout = open(os.devnull, "w")
+
+
+def soak_script(seed, frames):
+    # random held keys: [frame, event_type, key] like an InputLog, but without state hashes
+    import pygame
+    from scripts.constants import keys
+
+    rng = random.Random(seed)
+    events = []
+    frame = 0
+    while frame < frames:
+        frame += rng.randint(5, 40)
+        key = keys[rng.choice(SOAK_ACTIONS)]
+        events.append([frame, pygame.KEYDOWN, key])
+        events.append([frame + rng.randint(5, 30), pygame.KEYUP, key])
+    events.sort(key=lambda event: event[0])
+    return events
+
+
+def run_job(job):
+    import pygame
+    from game import Game
+    from scripts.replay import load_log
+
+    result = dict(job)
+    start = time.perf_counter()
+    game = None
+    try:
+        replay = load_log(job["replay"]) if job.get("replay") else None
+        game = Game(job.get("level", 0), headless=True, seed=job.get("seed", 0), replay=replay, map_path=job.get("map"))
+        frames = len(replay.hashes) if replay else job.get("frames", 600)
+        script = {}
+        if job.get("soak") and not replay:
+            for frame, event_type, key in soak_script(job.get("seed", 0), frames):
+                script.setdefault(frame, []).append((event_type, key))
+        while game.frame < frames and game.running:
+            for event_type, key in script.get(game.frame, ()):
+                pygame.event.post(pygame.event.Event(event_type, key=key))
+            game.tick()
+        result.update(
+            ticks=game.frame,
+            deaths=game.deaths,
+            clears=game.clears,
+            final_level=game.level,
+            enemies_left=len(game.enemies),
+        )
+        if replay:
+            result["replay_matched"] = replay.mismatch is None
+    except Exception as e:
+        result["error"] = type(e).__name__ + ": " + str(e)
+    result["seconds"] = time.perf_counter() - start
+    # a Game and its entities reference each other; collect it now or workers grow by ~250 MB a job
+    game = None
+    gc.collect()
+    return result
+
+
+def make_jobs(levels, seeds, replays, maps, frames, soak):
+    jobs = []
+    for level in levels:
+        for seed in seeds:
+            jobs.append({"level": level, "seed": seed, "frames": frames, "soak": soak})
+    for path in maps:
+        for seed in seeds:
+            jobs.append({"map": path, "seed": seed, "frames": frames, "soak": soak})
+    for path in replays:
+        jobs.append({"replay": path})
+    return jobs
+
+
+def run_batch(jobs, workers=None):
+    workers = workers or os.cpu_count() or 1
+    start = time.perf_counter()
+    # spawn keeps pygame/SDL state out of the children, each gets a fresh interpreter
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(workers, initializer=init_worker) as pool:
+        results = list(pool.imap_unordered(run_job, jobs))
+    wall = time.perf_counter() - start
+    results.sort(key=lambda result: (str(result.get("replay")), str(result.get("map")), result.get("level", 0), result.get("seed", 0)))
+    ticks = sum(result.get("ticks", 0) for result in results)
+    return {
+        "workers": workers,
+        "jobs": len(results),
+        "wall_seconds": wall,
+        "ticks": ticks,
+        "ticks_per_second": ticks / wall if wall else 0,
+        "deaths": sum(result.get("deaths", 0) for result in results),
+        "clears": sum(result.get("clears", 0) for result in results),
+        "errors": sum(1 for result in results if "error" in result),
+        "replay_mismatches": sum(1 for result in results if result.get("replay_matched") is False),
+        "results": results,
+    }
+
+
+def parse_seeds(text):
+    if "-" in text:
+        first, last = text.split("-")
+        return list(range(int(first), int(last) + 1))
+    return [int(seed) for seed in text.split(",")]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="run many headless games in parallel and collect their outcomes")
+    parser.add_argument("--level", type=int, action="append", help="level to run, repeatable")
+    parser.add_argument("--all-levels", action="store_true", help="run every map in data/maps")
+    parser.add_argument("--map", action="append", default=[], help="map json to run, repeatable")
+    parser.add_argument("--replay", action="append", default=[], help="input log to verify, repeatable")
+    parser.add_argument("--seeds", default="0", help="seed list or range, e.g. 0,4,7 or 0-99")
+    parser.add_argument("--frames", type=int, default=600)
+    parser.add_argument("--soak", action="store_true", help="drive each run with random seeded key presses")
+    parser.add_argument("--workers", type=int, default=None, help="processes, defaults to the cpu count")
+    parser.add_argument("--out", help="write the full report as json")
+    args = parser.parse_args()
+
+    levels = list(args.level or [])
+    if args.all_levels:
+        # only the numbered maps are levels; anything else in the folder is left alone
+        names = os.listdir(os.path.join(ROOT, "data/maps"))
+        levels += sorted(int(name[:-5]) for name in names if name.endswith(".json") and name[:-5].isdigit())
+    jobs = make_jobs(levels, parse_seeds(args.seeds), args.replay, args.map, args.frames, args.soak)
+    if not jobs:
+        parser.error("nothing to run, pass --level, --all-levels, --map or --replay")
+    report = run_batch(jobs, args.workers)
+
+    print(f"{'run':<24} {'seed':>5} {'ticks':>6} {'deaths':>6} {'clears':>6} {'s':>6}  status")
+    for result in report["results"]:
+        name = result.get("replay") or result.get("map") or "level " + str(result["level"])
+        status = result.get("error") or ("diverged" if result.get("replay_matched") is False else "ok")
+        print(
+            f"{os.path.basename(str(name)):<24} {result.get('seed', ''):>5} {result.get('ticks', 0):>6} "
+            f"{result.get('deaths', 0):>6} {result.get('clears', 0):>6} {result['seconds']:>6.2f}  {status}"
+        )
+    print(
+        f"{report['jobs']} jobs on {report['workers']} workers in {report['wall_seconds']:.1f} s, "
+        f"{report['ticks_per_second']:.0f} ticks/s, {report['errors']} errors, {report['replay_mismatches']} replay mismatches"
+    )
+    if args.out:
+        f = open(args.out, "w")
+        json.dump(report, f, indent=1)
+        f.close()
+        print(args.out + " saved")
+    if report["errors"] or report["replay_mismatches"]:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
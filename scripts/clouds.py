@@ -26,23 +26,25 @@ class Cloud:
 
 
 class Clouds:
-    def __init__(self, tilemap, cloud_images, count=16):
+    def __init__(self, tilemap, cloud_images, count=16, rng=random):
         self.clouds = []
         extracted_clouds = tilemap.extract([("clouds", 0)])
         y_pos = []
 
         for cloud in extracted_clouds:
             y_pos.append(cloud["pos"][1])
+        if not y_pos:
+            y_pos.append(0)
 
         y_pos_index = 0
         for i in range(count):
-            depth = random.random() * 0.6 + 0.2
+            depth = rng.random() * 0.6 + 0.2
             adjusted_y = y_pos[y_pos_index] / depth - 500
             self.clouds.append(
                 Cloud(
-                    (random.random() * 99999, adjusted_y),
-                    random.choice(cloud_images),
-                    random.random() * 0.05 + 0.05,
+                    (rng.random() * 99999, adjusted_y),
+                    rng.choice(cloud_images),
+                    rng.random() * 0.05 + 0.05,
                     depth,
                 )
             )
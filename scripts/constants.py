@@ -0,0 +1,8 @@
+import pygame
+
+# plain data only: importing this must not open a window, touch the disk or pull in the game
+BASE_IMG_PATH = "data/images/"
+IMAGE_EXTENSIONS = (".png", ".jpg", ".bmp", ".gif")
+
+keys = {"quit": pygame.K_q, "mv_left": pygame.K_a, "mv_right": pygame.K_d, "mv_up": pygame.K_w, "mv_down": pygame.K_s, "jump": pygame.K_w, "dash": pygame.K_x, "surf": pygame.K_f, "attack": pygame.K_SPACE, "grab": pygame.K_e, "throw": pygame.K_SPACE, "menu": pygame.K_m, "profiler": pygame.K_p, "profiler_dump": pygame.K_o}
+colors = {"WHITE": (255, 255, 255), "BLACK": (0, 0, 0), "RED": (255, 0, 0), "GREEN": (0, 255, 0), "BLUE": (0, 0, 255), "YELLOW": (255, 255, 0), "CYAN": (0, 255, 255), "MAGENTA": (255, 0, 255), "GRAY": (128, 128, 128), "DARK_GRAY": (64, 64, 64), "LIGHT_GRAY": (192, 192, 192), "ORANGE": (255, 165, 0), "PURPLE": (128, 0, 128), "BROWN": (139, 69, 19), "PINK": (255, 192, 203)}
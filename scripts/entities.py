@@ -1,17 +1,30 @@
 import math
-import random
 import pygame
 import time
 
 from scripts.particle import Particle
 from scripts.spark import Spark
-from game import keys
+from scripts.constants import keys
+
+
+MOVABLE_MARGIN = 16
+
+COL_UP = 1
+COL_DOWN = 2
+COL_LEFT = 4
+COL_RIGHT = 8
 
 
 def get_movables(game, exclude_rect=None):
+    # the box grid is rebuilt once per tick, so candidates are gathered with a margin
+    # covering how far a box can travel before the next rebuild
+    if exclude_rect is None:
+        boxes = game.boxes
+    else:
+        boxes = game.box_grid.query(exclude_rect, margin=MOVABLE_MARGIN)
     rects = []
-    for dstr in game.boxes.copy():
-        if dstr.is_held:
+    for dstr in boxes:
+        if dstr.is_held or dstr.alive <= 0:
             continue
         rect = dstr.rect()
         if exclude_rect is None or rect != exclude_rect:
@@ -20,15 +33,39 @@ def get_movables(game, exclude_rect=None):
 
 
 class PhysicsEntity:
+    __slots__ = (
+        "game",
+        "type",
+        "in_water",
+        "pos",
+        "size",
+        "velocity",
+        "force",
+        "collisions",
+        "action",
+        "animation",
+        "anim_offset",
+        "flip",
+        "last_movement",
+        "_rect",
+        "_rect_pos",
+    )
+    hitbox_trim = 0
+
     def __init__(self, game, e_type, pos, size):
         self.game = game
         self.type = e_type
+        self.size = size
+        self._rect = pygame.Rect(pos[0], pos[1], size[0], size[1] - self.hitbox_trim)
+        self.reset(pos)
+
+    def reset(self, pos):
+        # everything a spawn sets up; a respawn calls this again on the same object instead of building a new one
         self.in_water = 0
         self.pos = list(pos)
-        self.size = size
         self.velocity = [0, 0]
         self.force = [0, 0]
-        self.collisions = {"up": False, "down": False, "left": False, "right": False}
+        self.collisions = 0
 
         self.action = ""
         self.anim_offset = (-3, -3)
@@ -37,16 +74,25 @@ class PhysicsEntity:
 
         self.last_movement = [0, 0]
 
+        self._rect.update(self.pos[0], self.pos[1], self.size[0], self.size[1] - self.hitbox_trim)
+        self._rect_pos = (self.pos[0], self.pos[1])
+
     def rect(self):
-        return pygame.Rect(self.pos[0], self.pos[1], self.size[0], self.size[1])
+        # one rect per entity, refreshed in place when pos moves; callers that resize it
+        # must write the result back into pos, as update() does
+        pos = self.pos
+        if pos[0] != self._rect_pos[0] or pos[1] != self._rect_pos[1]:
+            self._rect_pos = (pos[0], pos[1])
+            self._rect.update(pos[0], pos[1], self.size[0], self.size[1] - self.hitbox_trim)
+        return self._rect
 
     def set_action(self, action):
         if action != self.action:
             self.action = action
-            self.animation = self.game.assets[self.type + "/" + self.action].copy()
+            self.animation = self.game.animations[self.type][action].copy()
 
     def update(self, tilemap, movement=(0, 0), force=(0, 0)):
-        self.collisions = {"up": False, "down": False, "right": False, "left": False}
+        self.collisions = 0
 
         frame_movement = (
             movement[0] + self.velocity[0] + self.force[0],
@@ -59,10 +105,10 @@ class PhysicsEntity:
             if entity_rect.colliderect(rect):
                 if frame_movement[0] > 0:
                     entity_rect.right = rect.left
-                    self.collisions["right"] = True
+                    self.collisions |= COL_RIGHT
                 if frame_movement[0] < 0:
                     entity_rect.left = rect.right
-                    self.collisions["left"] = True
+                    self.collisions |= COL_LEFT
                 self.pos[0] = entity_rect.x
         self.pos[1] += frame_movement[1]
         entity_rect = self.rect()
@@ -70,18 +116,18 @@ class PhysicsEntity:
             if entity_rect.colliderect(rect):
                 if frame_movement[1] > 0:
                     entity_rect.bottom = rect.top
-                    self.collisions["down"] = True
+                    self.collisions |= COL_DOWN
                 if frame_movement[1] < 0:
                     entity_rect.top = rect.bottom
-                    self.collisions["up"] = True
+                    self.collisions |= COL_UP
                 self.pos[1] = entity_rect.y
-        rects = get_movables(self.game, self.rect())
-        for rect in rects:
-            if self.rect().colliderect(rect):
-                if rect.y > self.rect().y:
-                    self.collisions["down"] = True
+        entity_rect = self.rect()
+        for rect in get_movables(self.game, entity_rect):
+            if entity_rect.colliderect(rect):
+                if rect.y > entity_rect.y:
+                    self.collisions |= COL_DOWN
 
-        in_water = tilemap.water_check((self.rect().centerx + (-7 if self.flip else 7), self.pos[1]))
+        in_water = tilemap.water_check((entity_rect.centerx + (-7 if self.flip else 7), self.pos[1]))
         if in_water:
             self.in_water += 1
         else:
@@ -94,23 +140,25 @@ class PhysicsEntity:
 
         self.last_movement = movement
 
-        self.force = (self.force[0] + force[0], self.force[1] + force[1])
-
-        if self.force[0] > 0 and self.collisions["down"] or self.in_water:
-            self.force = (max(self.force[0] - (0.05 if self.in_water else 0.3), 0), self.force[1])
-        elif self.force[0] < 0 and self.collisions["down"] or self.in_water:
-            self.force = (min(self.force[0] + (0.05 if self.in_water else 0.3), 0), self.force[1])
-        if self.force[1] > 0:
-            self.force = (self.force[0], max(self.force[1] - 0.1, 0.1 if self.in_water else 0))
-        elif self.force[1] < 0:
-            self.force = (self.force[0], min(self.force[1] + 0.1, -0.1 if self.in_water else 0))
-        if abs(self.force[0]) < 0.01:
-            self.force = (0, self.force[1])
-        if abs(self.force[1]) < 0.01:
-            self.force = (self.force[0], 0)
+        self_force = self.force
+        self_force[0] += force[0]
+        self_force[1] += force[1]
+
+        if self_force[0] > 0 and self.collisions & COL_DOWN or self.in_water:
+            self_force[0] = max(self_force[0] - (0.05 if self.in_water else 0.3), 0)
+        elif self_force[0] < 0 and self.collisions & COL_DOWN or self.in_water:
+            self_force[0] = min(self_force[0] + (0.05 if self.in_water else 0.3), 0)
+        if self_force[1] > 0:
+            self_force[1] = max(self_force[1] - 0.1, 0.1 if self.in_water else 0)
+        elif self_force[1] < 0:
+            self_force[1] = min(self_force[1] + 0.1, -0.1 if self.in_water else 0)
+        if abs(self_force[0]) < 0.01:
+            self_force[0] = 0
+        if abs(self_force[1]) < 0.01:
+            self_force[1] = 0
 
         if self.in_water:
-            self.force = (self.force[0], 0.1 if self.in_water < 50 else -0.09999)
+            self_force[1] = 0.1 if self.in_water < 50 else -0.09999
             if self.in_water > 100:
                 self.in_water = 1
 
@@ -120,7 +168,7 @@ class PhysicsEntity:
         else:
             self.velocity[1] = min(5, self.velocity[1] + 0.1)
 
-        if self.collisions["down"] or self.collisions["up"]:
+        if self.collisions & (COL_DOWN | COL_UP):
             self.velocity[1] = 0
 
         self.animation.update()
@@ -142,146 +190,105 @@ class PhysicsEntity:
 
 
 class Enemy(PhysicsEntity):
+    __slots__ = ("walking", "alive")
+
     def __init__(self, game, pos, size):
         super().__init__(game, "enemy", pos, size)
 
+    def reset(self, pos):
+        super().reset(pos)
         self.walking = 0
         self.alive = 1
 
     def update(self, tilemap, movement=(0, 0)):
-        if self.walking:
-            if tilemap.solid_check((self.rect().centerx + (-7 if self.flip else 7), self.pos[1] + 23)):
-                if self.collisions["right"] or self.collisions["left"]:
-                    self.flip = not self.flip
-                else:
-                    movement = (movement[0] - 0.5 if self.flip else 0.5, movement[1])
-            else:
-                self.flip = not self.flip
-            self.walking = max(0, self.walking - 1)
-            if not self.walking:
-                dis = (
-                    self.game.player.pos[0] - self.pos[0],
-                    self.game.player.pos[1] - self.pos[1],
-                )
-                if abs(dis[1]) < 16:
-                    if self.flip and dis[0] < 0:
-                        self.game.sfx["shoot"].play()
-                        self.game.projectiles.append(
-                            [
-                                [self.rect().centerx - 7, self.rect().centery],
-                                -1.5,
-                                0,
-                                False,
-                            ]
-                        )
-                        for i in range(4):
-                            self.game.sparks.append(
-                                Spark(
-                                    self.game.projectiles[-1][0],
-                                    random.random() - 0.5 + math.pi,
-                                    2 + random.random(),
-                                )
-                            )
-                    if not self.flip and dis[0] > 0:
-                        self.game.projectiles.append(
-                            [
-                                [self.rect().centerx + 7, self.rect().centery],
-                                1.5,
-                                0,
-                                False,
-                            ]
-                        )
-                        for i in range(4):
-                            self.game.sparks.append(
-                                Spark(
-                                    self.game.projectiles[-1][0],
-                                    random.random() - 0.5,
-                                    2 + random.random(),
-                                )
-                            )
-        elif random.random() < 0.01:
-            self.walking = random.randint(30, 120)
-
+        # patrol and shooting decisions come from game.patrol, which passes them in as movement
         super().update(tilemap, movement=movement, force=(0 if self.alive else 2, 0))
         if movement[0] != 0:
             self.set_action("run")
         else:
             self.set_action("idle")
 
-        if abs(self.game.player.dashing) >= 50 or self.game.player.powJump > 0:
-            if self.rect().colliderect(self.game.player.rect()):
+        my_rect = self.rect()
+        player = self.game.player
+        if abs(player.dashing) >= 50 or player.powJump > 0:
+            if my_rect.colliderect(player.rect()):
                 self.alive = 0
 
-        if self.game.player.powJump > 0:
-            if self.rect().colliderect(self.game.player.jumpDown_rect()):
+        if player.powJump > 0:
+            if my_rect.colliderect(player.jumpDown_rect()):
                 self.alive = 0
 
-        if self.game.player.attacking == 15:
-            if self.rect().colliderect(self.game.player.attack_rect()):
+        if player.attacking == 15:
+            if my_rect.colliderect(player.attack_rect()):
                 self.alive = 0
 
         if self.alive <= 0:
-            self.game.sfx["hit"].play()
+            self.game.sound_queue.emit("hit", my_rect.center)
+            center = my_rect.center
             for i in range(15):
-                angle = random.random() * math.pi * 2
-                speed = random.random() * 5
-                self.game.sparks.append(Spark(self.rect().center, angle, 1 + random.random(), (255, 0, 0, 100)))
+                angle = self.game.rng.random() * math.pi * 2
+                speed = self.game.rng.random() * 5
+                self.game.sparks.append(Spark(center, angle, 1 + self.game.rng.random(), (255, 0, 0, 100)))
                 self.game.particles.append(
                     Particle(
                         self.game,
                         "particle",
-                        self.rect().center,
+                        center,
                         velocity=[
                             math.cos(angle + math.pi) * speed * 0.5,
                             math.sin(angle + math.pi) * speed * 0.5,
                         ],
-                        frame=random.randint(0, 7),
+                        frame=self.game.rng.randint(0, 7),
                     )
                 )
-                self.game.sparks.append(Spark(self.rect().center, 0, 1 + random.random()))
-                self.game.sparks.append(Spark(self.rect().center, math.pi, 1 + random.random()))
+                self.game.sparks.append(Spark(center, 0, 1 + self.game.rng.random()))
+                self.game.sparks.append(Spark(center, math.pi, 1 + self.game.rng.random()))
 
             return True
 
     def render(self, surf, offset=(0, 0)):
         super().render(surf, offset=offset)
 
+        my_rect = self.rect()
         if self.flip:
             surf.blit(
                 pygame.transform.flip(self.game.assets["gun"], True, False),
                 (
-                    self.rect().centerx - 4 - self.game.assets["gun"].get_width() - offset[0],
-                    self.rect().centery - offset[1],
+                    my_rect.centerx - 4 - self.game.assets["gun"].get_width() - offset[0],
+                    my_rect.centery - offset[1],
                 ),
             )
         else:
             surf.blit(
                 self.game.assets["gun"],
-                (self.rect().centerx + 4 - offset[0], self.rect().centery - offset[1]),
+                (my_rect.centerx + 4 - offset[0], my_rect.centery - offset[1]),
             )
 
 
 class Box(PhysicsEntity):
+    __slots__ = ("audioPlayed", "alive", "is_held", "grab_offs")
+
     def __init__(self, game, pos, size):
         super().__init__(game, "box", pos, size)
+
+    def reset(self, pos):
+        super().reset(pos)
         self.audioPlayed = 0
         self.alive = 1
         self.is_held = 0
-        self.collisions = {"up": False, "down": False, "right": False, "left": False}
-        self.grab_offs = random.randint(-2, 2)
+        self.grab_offs = self.game.rng.randint(-2, 2)
 
     def update(self, tilemap, movement=(0, 0)):
         force = (0, 0)
-        rects = get_movables(self.game, self.rect())
         my_rect = self.rect()
-        for rect in rects:
+        for rect in get_movables(self.game, my_rect):
             if my_rect.colliderect(rect):
                 if rect.y > my_rect.y:
                     self.velocity[1] = 0
                 elif rect.y == my_rect.y:
-                    movement = (1 if rect.x < self.rect().x else -1, 0)
+                    movement = (1 if rect.x < my_rect.x else -1, 0)
 
-        if self.rect().colliderect(self.game.player.attack_rect()):
+        if my_rect.colliderect(self.game.player.attack_rect()):
             if self.game.player.attacking == 10:
                 self.alive = 0
             elif not self.is_held and self.game.input == keys["grab"]:
@@ -295,8 +302,8 @@ class Box(PhysicsEntity):
             self.game.player.pushing = 1
             if self.game.dead:
                 self.is_held = 0
-                self.game.player.is_gabbing = 0
-                force = (random.randint(-5, 5), 5)
+                self.game.player.is_holding = 0
+                force = (self.game.rng.randint(-5, 5), 5)
             else:
                 self.velocity[1] = 0
                 self.velocity[0] = 0
@@ -312,29 +319,32 @@ class Box(PhysicsEntity):
                         if box.is_held:
                             box.is_held -= 1
 
-        if self.game.player.powJump:
-            if self.rect().colliderect(self.game.player.jumpDown_rect()):
+        my_rect = self.rect()
+        player = self.game.player
+        if player.powJump:
+            if my_rect.colliderect(player.jumpDown_rect()):
                 self.alive = 0
 
-        if self.rect().colliderect(self.game.player.rect()):
-            if abs(self.game.player.dashing) >= 50:
+        player_rect = player.rect()
+        if my_rect.colliderect(player_rect):
+            if abs(player.dashing) >= 50:
                 self.alive = 0
-            elif not self.collisions["right"] or self.collisions["left"]:
-                if self.rect().y - self.game.player.rect().y < 6 and abs(self.rect().x - self.game.player.rect().x) > 4:
-                    if self.game.player.flip and self.game.player.rect().x - self.rect().x > 0:
+            elif not self.collisions & COL_RIGHT or self.collisions & COL_LEFT:
+                if my_rect.y - player_rect.y < 6 and abs(my_rect.x - player_rect.x) > 4:
+                    if player.flip and player_rect.x - my_rect.x > 0:
                         movement = (-1, 0)
-                        self.game.player.pushing = 1
-                    elif not self.game.player.flip and self.game.player.rect().x - self.rect().x < 0:
+                        player.pushing = 1
+                    elif not player.flip and player_rect.x - my_rect.x < 0:
                         movement = (1, 0)
-                        self.game.player.pushing = 1
+                        player.pushing = 1
 
         if self.alive <= 0:
+            self.game.sound_queue.emit("clonk", my_rect.center)
             for i in range(15):
-                angle = random.random() * math.pi * 2
-                self.game.sparks.append(Spark(self.rect().center, angle, 2, (139, 69, 19, 120)))
-                self.game.sfx["clonk"].play()
+                angle = self.game.rng.random() * math.pi * 2
+                self.game.sparks.append(Spark(my_rect.center, angle, 2, (139, 69, 19, 120)))
             return True
-        self.collisions = super().update(tilemap, movement=movement, force=force)
+        super().update(tilemap, movement=movement, force=force)
 
     def render(self, surf, offset=(0, 0)):
         adj_offset = (offset[0] - 2, offset[1] - 2)
@@ -345,10 +355,15 @@ class Box(PhysicsEntity):
 
 
 class Bird(PhysicsEntity):
-    def __init__(self, game, pos, size, index=0):
+    __slots__ = ("walking", "flight", "x_dir", "y_dir", "rotation_angle", "alive", "audio_played")
+    hitbox_trim = 4
+
+    def __init__(self, game, pos, size):
         super().__init__(game, "bird", pos, size)
+
+    def reset(self, pos):
+        super().reset(pos)
         self.walking = 0
-        self.au_index = index
         self.flight = 0
         self.x_dir = 0
         self.y_dir = 0
@@ -357,66 +372,18 @@ class Bird(PhysicsEntity):
         self.audio_played = 0
         self.set_action("idle")
 
-    def rect(self):
-        return pygame.Rect(
-            self.pos[0],
-            self.pos[1],
-            self.size[0],
-            self.size[1] - 4,
-        )
-
     def update(self, tilemap, movement=(0, 0)):
+        # game.flock has already run the player proximity check and picked flight directions
         if self.audio_played:
             self.audio_played += 1
         if not self.alive:
-            self.game.sfx["hit"].play()
+            self.game.sound_queue.emit("hit", self.rect().center)
+            center = self.rect().center
             for i in range(15):
-                angle = random.random() * math.pi * 2
-                self.game.sparks.append(Spark(self.rect().center, angle, 1 + random.random(), (255, 0, 0, 100)))
+                angle = self.game.rng.random() * math.pi * 2
+                self.game.sparks.append(Spark(center, angle, 1 + self.game.rng.random(), (255, 0, 0, 100)))
 
             return True
-        else:
-            self.velocity[1] = 0
-
-            dist = math.sqrt(sum((self.pos[i] - self.game.player.pos[i]) ** 2 for i in range(len(self.pos))))
-            if abs(dist) < 20:
-                if self.game.player.action == "attack":
-                    self.alive = 0
-                self.flight = 50
-                if not self.audio_played:
-                    self.game.flight_sfx_pool[self.au_index].play()
-                    self.audio_played = 1
-
-                # Initialize potential directions
-                possible_x_dirs = [
-                    -5,
-                    -4,
-                    -3,
-                    -2,
-                    -1,
-                    1,
-                    2,
-                    3,
-                    4,
-                    5,
-                ]
-                possible_y_dirs = [-5, -4, -3, -2]
-                if self.collisions["left"]:
-                    possible_x_dirs = [d for d in possible_x_dirs if d > 0]
-                if self.collisions["right"]:
-                    possible_x_dirs = [d for d in possible_x_dirs if d < 0]
-                if self.collisions["up"]:
-                    possible_y_dirs = [d for d in possible_y_dirs if d > 0]
-                if self.collisions["down"]:
-                    possible_y_dirs = [d for d in possible_y_dirs if d < 0]
-                if possible_x_dirs:
-                    self.x_dir = random.choice(possible_x_dirs)
-                else:
-                    self.x_dir = 0
-                if possible_y_dirs:
-                    self.y_dir = random.choice(possible_y_dirs)
-                else:
-                    self.y_dir = 0
         if self.flight:
             self.flight -= 1
             self.rotation_angle = 0
@@ -430,7 +397,7 @@ class Bird(PhysicsEntity):
                 self.check_landing()
         elif self.alive:
             self.check_landing()
-            if not self.collisions["down"] and self.rotation_angle == 0:
+            if not self.collisions & COL_DOWN and self.rotation_angle == 0:
                 self.velocity[1] += 0.1
 
         super().update(tilemap, movement=movement)
@@ -446,13 +413,13 @@ class Bird(PhysicsEntity):
         )
 
     def check_landing(self):
-        if self.collisions["left"]:
+        if self.collisions & COL_LEFT:
             self.set_landing(-90)
-        elif self.collisions["right"]:
+        elif self.collisions & COL_RIGHT:
             self.set_landing(90)
-        elif self.collisions["up"]:
+        elif self.collisions & COL_UP:
             self.set_landing(180)
-        elif self.collisions["down"]:
+        elif self.collisions & COL_DOWN:
             self.set_landing(0)
 
     def set_landing(self, rot_angle):
@@ -462,72 +429,22 @@ class Bird(PhysicsEntity):
         self.set_action("idle")
         self.flight = 0
         self.audio_played = 0
-        self.game.flight_sfx_pool[self.au_index].stop()
+        self.game.flock.stop_audio(self)
 
 
 class Mob(PhysicsEntity):
+    __slots__ = ("walking", "alive")
+    hitbox_trim = 4
+
     def __init__(self, game, pos, size):
         super().__init__(game, "mob", pos, size)
+
+    def reset(self, pos):
+        super().reset(pos)
         self.walking = 0
         self.alive = 1
 
-    def rect(self):
-        return pygame.Rect(self.pos[0], self.pos[1], self.size[0], self.size[1] - 4)
-
     def update(self, tilemap, movement=(0, 0)):
-        if self.walking:
-            if tilemap.solid_check((self.rect().centerx + (-7 if self.flip else 7), self.pos[1] + 23)):
-                if self.collisions["right"] or self.collisions["left"]:
-                    self.flip = not self.flip
-                else:
-                    movement = (movement[0] - 0.5 if self.flip else 0.5, movement[1])
-            else:
-                self.flip = not self.flip
-            self.walking = max(0, self.walking - 1)
-            if not self.walking:
-                dis = (
-                    self.game.player.pos[0] - self.pos[0],
-                    self.game.player.pos[1] - self.pos[1],
-                )
-                if abs(dis[1]) < 16:
-                    if self.flip and dis[0] < 0:
-                        self.game.sfx["shoot"].play()
-                        self.game.projectiles.append(
-                            [
-                                [self.rect().centerx - 7, self.rect().centery],
-                                -1.5,
-                                0,
-                                False,
-                            ]
-                        )
-                        for i in range(4):
-                            self.game.sparks.append(
-                                Spark(
-                                    self.game.projectiles[-1][0],
-                                    random.random() - 0.5 + math.pi,
-                                    2 + random.random(),
-                                )
-                            )
-                    if not self.flip and dis[0] > 0:
-                        self.game.projectiles.append(
-                            [
-                                [self.rect().centerx + 7, self.rect().centery],
-                                1.5,
-                                0,
-                                False,
-                            ]
-                        )
-                        for i in range(4):
-                            self.game.sparks.append(
-                                Spark(
-                                    self.game.projectiles[-1][0],
-                                    random.random() - 0.5,
-                                    2 + random.random(),
-                                )
-                            )
-        elif random.random() < 0.01:
-            self.walking = random.randint(30, 120)
-
         super().update(tilemap, movement=movement)
         if movement[0] != 0:
             self.set_action("run")
@@ -539,6 +456,8 @@ class Mob(PhysicsEntity):
 
 
 class Demo(PhysicsEntity):
+    __slots__ = ()
+
     def __init__(self, game, pos, size):
         self.action = "idle"
         self.set_action("idle")
@@ -554,6 +473,24 @@ class Demo(PhysicsEntity):
 
 
 class Player(PhysicsEntity):
+    __slots__ = (
+        "jumps",
+        "surf_audio_played",
+        "wall_slide",
+        "air_time",
+        "dashing",
+        "deflecting",
+        "attacking",
+        "pushing",
+        "powJump",
+        "is_swiming",
+        "bul_surf",
+        "is_holding_count",
+        "is_holding",
+        "start_width",
+        "alive",
+    )
+
     def __init__(self, game, pos, size):
         super().__init__(game, "player", pos, size)
         self.jumps = 2
@@ -591,12 +528,12 @@ class Player(PhysicsEntity):
 
     def update(self, tilemap, movement=(0, 0)):
         if self.is_holding_count != self.is_holding:
-            self.game.sfx["clonk"].play()
+            self.game.sound_queue.emit("clonk")
             self.is_holding_count = self.is_holding
         if self.powJump >= 28:
             self.powJump -= 1
             if self.powJump == 27:
-                self.game.sfx["dash"].play()
+                self.game.sound_queue.emit("dash")
             return
         if self.powJump < 0:
             self.set_action("powJump")
@@ -616,9 +553,13 @@ class Player(PhysicsEntity):
             self.game.sfx["wind"].stop()
             self.surf_audio_played = 0
 
-        for box in self.game.boxes:
-            if self.rect().y + self.rect().height - 4 < box.rect().y and self.rect().colliderect(box.rect()) and abs(self.rect().x - box.rect().x) < box.rect().width:
-                self.collisions["down"] = 1
+        my_rect = self.rect()
+        for box in self.game.box_grid.query(my_rect, margin=MOVABLE_MARGIN):
+            if box.alive <= 0:
+                continue
+            box_rect = box.rect()
+            if my_rect.y + my_rect.height - 4 < box_rect.y and my_rect.colliderect(box_rect) and abs(my_rect.x - box_rect.x) < box_rect.width:
+                self.collisions |= COL_DOWN
                 self.velocity[1] = 0
                 self.air_time = 0
                 self.jumps = 2
@@ -626,12 +567,12 @@ class Player(PhysicsEntity):
         self.attacking = max(self.attacking - 1, 0)
 
         self.powJump = max(0, self.powJump - 1)
-        if self.powJump and not self.collisions["down"]:
+        if self.powJump and not self.collisions & COL_DOWN:
             self.velocity[0] = 0
             self.velocity[1] = 15
             for i in range(5):
-                angle = random.random() * math.pi * 2
-                speed = random.random() * 0.5 + 0.5
+                angle = self.game.rng.random() * math.pi * 2
+                speed = self.game.rng.random() * 0.5 + 0.5
                 pvelocity = [math.cos(angle) * speed, math.sin(angle) * speed]
                 self.game.particles.append(
                     Particle(
@@ -639,35 +580,35 @@ class Player(PhysicsEntity):
                         "particle",
                         self.rect().center,
                         velocity=pvelocity,
-                        frame=random.randint(0, 7),
+                        frame=self.game.rng.randint(0, 7),
                     )
                 )
             return
         if self.powJump:
             for i in range(50):
-                angle = random.random() * math.pi * 2
-                speed = random.random() * 0.5 + 0.5
+                angle = self.game.rng.random() * math.pi * 2
+                speed = self.game.rng.random() * 0.5 + 0.5
                 pvelocity = [math.cos(angle) * speed, math.sin(angle) * speed]
                 self.game.particles.append(
                     Particle(
                         self.game,
                         "particle",
                         (
-                            self.rect().center[0] + random.randint(-30, 30),
-                            self.rect().center[1] + random.randint(-5, 5),
+                            self.rect().center[0] + self.game.rng.randint(-30, 30),
+                            self.rect().center[1] + self.game.rng.randint(-5, 5),
                         ),
                         velocity=pvelocity,
-                        frame=random.randint(0, 1),
+                        frame=self.game.rng.randint(0, 1),
                     )
                 )
-            if self.collisions["down"]:
-                self.game.sfx["slash"].play()
+            if self.collisions & COL_DOWN:
+                self.game.sound_queue.emit("slash")
                 self.powJump = 0
         if self.attacking:
             self.bul_surf = 0
             self.set_action("attack")
             if self.attacking == 10:
-                self.game.sfx["slash"].play()
+                self.game.sound_queue.emit("slash")
                 for i in range(2):
                     self.game.sparks.append(
                         Spark(
@@ -675,8 +616,8 @@ class Player(PhysicsEntity):
                                 (self.pos[0] + (-15 if self.flip else 15)),
                                 self.pos[1] + 3,
                             ),
-                            random.random() - 0.5 + (math.pi if self.flip else 0),
-                            2 + random.random(),
+                            self.game.rng.random() - 0.5 + (math.pi if self.flip else 0),
+                            2 + self.game.rng.random(),
                         )
                     )
         self.air_time += 1
@@ -684,16 +625,16 @@ class Player(PhysicsEntity):
         if self.pos[1] > 500:
             self.game.dead += 1
 
-        if self.collisions["down"]:
+        if self.collisions & COL_DOWN:
             self.air_time = 0
             self.jumps = 2
 
         self.wall_slide = False
-        if self.collisions["right"] or self.collisions["left"] and self.air_time > 4:
+        if self.collisions & COL_RIGHT or self.collisions & COL_LEFT and self.air_time > 4:
             self.dashing = 0
             self.wall_slide = True
             self.velocity[1] = min(self.velocity[1], 0.5)
-            if self.collisions["right"]:
+            if self.collisions & COL_RIGHT:
                 self.flip = False
             else:
                 self.flip = True
@@ -703,9 +644,9 @@ class Player(PhysicsEntity):
         if self.in_water:
             self.set_action("swim")
             if self.game.last_pressed_input == keys["mv_down"]:
-                self.force = (self.force[0], 1)
+                self.force[1] = 1
             elif self.game.last_pressed_input == keys["mv_up"]:
-                self.force = (self.force[0], -1)
+                self.force[1] = -1
 
         if self.is_swiming or self.in_water:
             self.set_action("swim")
@@ -721,8 +662,8 @@ class Player(PhysicsEntity):
 
         if abs(self.dashing) in {60, 50}:
             for i in range(30):
-                angle = random.random() * math.pi * 2
-                speed = random.random() * 0.5 + 0.5
+                angle = self.game.rng.random() * math.pi * 2
+                speed = self.game.rng.random() * 0.5 + 0.5
                 pvelocity = [math.cos(angle) * speed, math.sin(angle) * speed]
                 self.game.particles.append(
                     Particle(
@@ -730,7 +671,7 @@ class Player(PhysicsEntity):
                         "particle",
                         self.rect().center,
                         velocity=pvelocity,
-                        frame=random.randint(0, 7),
+                        frame=self.game.rng.randint(0, 7),
                     )
                 )
 
@@ -742,14 +683,14 @@ class Player(PhysicsEntity):
             self.velocity[0] = abs(self.dashing) / self.dashing * 8
             if abs(self.dashing) == 51:
                 self.velocity[0] *= 0.1
-            pvelocity = [abs(self.dashing) / self.dashing * random.random() * 3, 0]
+            pvelocity = [abs(self.dashing) / self.dashing * self.game.rng.random() * 3, 0]
             self.game.particles.append(
                 Particle(
                     self.game,
                     "particle",
                     self.rect().center,
                     velocity=pvelocity,
-                    frame=random.randint(0, 7),
+                    frame=self.game.rng.randint(0, 7),
                 )
             )
         if self.velocity[0] > 0:
@@ -797,7 +738,7 @@ class Player(PhysicsEntity):
 
     def dash(self):
         if not self.dashing:
-            self.game.sfx["dash"].play()
+            self.game.sound_queue.emit("dash")
             if self.flip:
                 self.dashing = -60
             else:
@@ -0,0 +1,71 @@
+from scripts.entities import COL_UP, COL_DOWN, COL_LEFT, COL_RIGHT
+
+STARTLE_DIST = 20
+X_DIRS = (-5, -4, -3, -2, -1, 1, 2, 3, 4, 5)
+Y_DIRS = (-5, -4, -3, -2)
+# every filtered direction list has a length dividing this, so one roll maps uniformly onto any of them
+DIRECTION_ROLLS = range(20)
+
+
+def flight_directions(collisions):
+    x_dirs = X_DIRS
+    y_dirs = Y_DIRS
+    if collisions & COL_LEFT:
+        x_dirs = tuple(d for d in x_dirs if d > 0)
+    if collisions & COL_RIGHT:
+        x_dirs = tuple(d for d in x_dirs if d < 0)
+    if collisions & COL_UP:
+        y_dirs = tuple(d for d in y_dirs if d > 0)
+    if collisions & COL_DOWN:
+        y_dirs = tuple(d for d in y_dirs if d < 0)
+    return x_dirs, y_dirs
+
+
+FLIGHT_DIRECTIONS = [flight_directions(mask) for mask in range(16)]
+
+
+class Flock:
+    def __init__(self, game):
+        self.game = game
+        self.audio_events = []
+
+    def step(self, birds):
+        player = self.game.player
+        px, py = player.pos
+        startle_sq = STARTLE_DIST * STARTLE_DIST
+        startled = [
+            bird
+            for bird in birds
+            if bird.alive and (bird.pos[0] - px) * (bird.pos[0] - px) + (bird.pos[1] - py) * (bird.pos[1] - py) < startle_sq
+        ]
+        for bird in birds:
+            if bird.alive:
+                bird.velocity[1] = 0
+        if not startled:
+            return
+
+        attacking = player.action == "attack"
+        rolls = self.game.rng.choices(DIRECTION_ROLLS, k=len(startled) * 2)
+        for i, bird in enumerate(startled):
+            if attacking:
+                bird.alive = 0
+            bird.flight = 50
+            if not bird.audio_played:
+                self.audio_events.append((True, bird))
+                bird.audio_played = 1
+            x_dirs, y_dirs = FLIGHT_DIRECTIONS[bird.collisions]
+            bird.x_dir = x_dirs[rolls[i * 2] % len(x_dirs)] if x_dirs else 0
+            bird.y_dir = y_dirs[rolls[i * 2 + 1] % len(y_dirs)] if y_dirs else 0
+
+    def stop_audio(self, bird):
+        self.audio_events.append((False, bird))
+
+    def flush_audio(self):
+        voices = self.game.voices
+        sound = self.game.sfx["flight"]
+        for play, bird in self.audio_events:
+            if play:
+                voices.play(sound, emitter=bird)
+            else:
+                voices.stop(bird)
+        self.audio_events.clear()
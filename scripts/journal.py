@@ -0,0 +1,131 @@
+from collections import deque
+
+GRID = 0
+OFFGRID = 1
+
+
+class EditJournal:
+    # in-memory undo/redo for the editor. every edit goes through here and a stroke keeps only what it changed:
+    # (GRID, loc, before, after) with None for an empty cell, or (OFFGRID, index, tile, added)
+    def __init__(self, max_changes=100000, offgrid_index=None):
+        self.max_changes = max_changes
+        # kept in step with every offgrid change, including undo and redo
+        self.offgrid_index = offgrid_index
+        self.undo_stack = deque()
+        self.redo_stack = []
+        self.stroke = []
+        self.size = 0
+        # bumped on every change, undo and redo, so savers can tell whether the map moved on
+        self.version = 0
+
+    def set_cell(self, tilemap, loc, tile):
+        if tilemap.tilemap.get(loc) == tile:
+            return False
+        cells = {loc: tile}
+        self.record(tilemap.apply_cells(cells), cells)
+        return True
+
+    def apply(self, tilemap, cells, offgrid=()):
+        # a region edit: every cell written in one pass and undone as one step
+        self.end_stroke()
+        self.record(tilemap.apply_cells(cells), cells)
+        for tile in offgrid:
+            self.add_offgrid(tilemap, tile)
+        self.end_stroke()
+
+    def record(self, before, cells):
+        for loc, tile in cells.items():
+            if before[loc] != tile:
+                self.stroke.append((GRID, loc, before[loc], tile))
+        self.version += 1
+
+    def add_offgrid(self, tilemap, tile):
+        self.insert_offgrid(tilemap, len(tilemap.offgrid_tiles), tile)
+        self.stroke.append((OFFGRID, len(tilemap.offgrid_tiles) - 1, tile, True))
+
+    def remove_offgrid(self, tilemap, index):
+        tile = self.pop_offgrid(tilemap, index)
+        self.stroke.append((OFFGRID, index, tile, False))
+
+    def clear(self, tilemap):
+        self.end_stroke()
+        for index in range(len(tilemap.offgrid_tiles) - 1, -1, -1):
+            self.remove_offgrid(tilemap, index)
+        cells = dict.fromkeys(tilemap.tilemap)
+        self.record(tilemap.apply_cells(cells), cells)
+        self.end_stroke()
+
+    def autotile(self, tilemap):
+        # new dicts, so the ones the journal already holds are never edited
+        self.apply(tilemap, {loc: dict(tilemap.tilemap[loc], variant=variant) for loc, variant in tilemap.autotile_variants().items()})
+
+    def end_stroke(self):
+        if not self.stroke:
+            return
+        self.undo_stack.append(self.stroke)
+        self.size += len(self.stroke)
+        self.stroke = []
+        self.redo_stack = []
+        while self.size > self.max_changes and len(self.undo_stack) > 1:
+            self.size -= len(self.undo_stack.popleft())
+
+    def undo(self, tilemap):
+        self.end_stroke()
+        if not self.undo_stack:
+            return 0
+        stroke = self.undo_stack.pop()
+        self.size -= len(stroke)
+        cells = {}
+        for kind, key, before, after in reversed(stroke):
+            if kind == GRID:
+                # a cell written twice in one stroke ends up with what it held first
+                cells[key] = before
+            elif after:
+                self.pop_offgrid(tilemap, key)
+            else:
+                self.insert_offgrid(tilemap, key, before)
+        tilemap.apply_cells(cells)
+        self.redo_stack.append(stroke)
+        self.version += 1
+        return len(stroke)
+
+    def redo(self, tilemap):
+        self.end_stroke()
+        if not self.redo_stack:
+            return 0
+        stroke = self.redo_stack.pop()
+        cells = {}
+        for kind, key, before, after in stroke:
+            if kind == GRID:
+                cells[key] = after
+            elif after:
+                self.insert_offgrid(tilemap, key, before)
+            else:
+                self.pop_offgrid(tilemap, key)
+        tilemap.apply_cells(cells)
+        self.undo_stack.append(stroke)
+        self.size += len(stroke)
+        self.version += 1
+        return len(stroke)
+
+    def insert_offgrid(self, tilemap, index, tile):
+        tilemap.offgrid_tiles.insert(index, tile)
+        if self.offgrid_index is not None:
+            self.offgrid_index.add(tile)
+        self.version += 1
+
+    def pop_offgrid(self, tilemap, index):
+        tile = tilemap.offgrid_tiles.pop(index)
+        if self.offgrid_index is not None:
+            self.offgrid_index.remove(tile)
+        self.version += 1
+        return tile
+
+    def reset(self, tilemap):
+        # a different map was loaded; its history starts empty
+        if self.offgrid_index is not None:
+            self.offgrid_index.rebuild(tilemap.offgrid_tiles)
+        self.undo_stack.clear()
+        self.redo_stack = []
+        self.stroke = []
+        self.size = 0
@@ -0,0 +1,90 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from scripts.tilemap import Tilemap
+
+MAPS_DIR = "data/maps"
+SPAWNER_IDS = [("spawners", 0), ("spawners", 1), ("spawners", 2), ("spawners", 3), ("spawners", 4)]
+DEMO_IDS = [("demo", 0), ("demo", 1)]
+LEAF_TREE_IDS = [("large_decor", 2)]
+
+
+def level_path(map_id):
+    return MAPS_DIR + "/" + str(map_id) + ".json"
+
+
+def count_levels():
+    # only the numbered maps are levels
+    return sum(1 for name in os.listdir(MAPS_DIR) if name.endswith(".json") and name[:-5].isdigit())
+
+
+class Level:
+    # a parsed map with its spawners already pulled out, ready for Game.load_level to adopt
+    __slots__ = ("path", "tilemap", "background", "spawners", "demos", "leaf_trees")
+
+    def __init__(self, path):
+        self.path = path
+        self.tilemap = Tilemap(None)
+        self.background = self.tilemap.load(path)
+        self.leaf_trees = self.tilemap.extract(LEAF_TREE_IDS, keep=True)
+        self.spawners = self.tilemap.extract(SPAWNER_IDS)
+        self.demos = self.tilemap.extract(DEMO_IDS)
+
+
+class LevelPreloader:
+    # parses upcoming maps on one worker thread; nothing here touches pygame, so it is safe off the main thread
+    def __init__(self):
+        self.pool = ThreadPoolExecutor(1)
+        self.pending = {}
+
+    def request(self, path):
+        if path not in self.pending and os.path.exists(path):
+            self.pending[path] = (os.stat(path).st_mtime_ns, self.pool.submit(Level, path))
+
+    def take(self, path):
+        # a file that was never requested, or was saved again since, is simply read here as before
+        mtime, future = self.pending.pop(path, (None, None))
+        if future is None or mtime != os.stat(path).st_mtime_ns:
+            return Level(path)
+        return future.result()
+
+    def ready(self, path):
+        # the parsed level if the worker has finished it, without waiting
+        mtime, future = self.pending.get(path, (None, None))
+        if future is None or not future.done():
+            return None
+        return future.result()
+
+
+class LevelSnapshot:
+    # the level as load_level left it. a respawn puts it back in place: no file, no parsing, no new entities
+    __slots__ = ("path", "grid", "offgrid", "solid_cells", "tile_size", "background", "leaf_spawners", "player_pos", "spawned", "groups")
+
+    def __init__(self, game, path, spawned):
+        tilemap = game.tilemap
+        self.path = path
+        # a copy, because clouds are extracted from the live grid once the first level is up; play never edits it after that
+        self.grid = dict(tilemap.tilemap)
+        self.offgrid = tilemap.offgrid_tiles
+        self.solid_cells = tilemap.solid_cells
+        self.tile_size = tilemap.tile_size
+        self.background = game.background
+        self.leaf_spawners = game.leaf_spawners
+        self.player_pos = list(game.player.pos)
+        # (entity, spawn position) in spawner order, which is also the order entities draw from game.rng
+        self.spawned = spawned
+        self.groups = (list(game.enemies), list(game.boxes), list(game.birds), list(game.mobs), list(game.demo_boards))
+
+    def restore(self, game):
+        tilemap = game.tilemap
+        tilemap.tilemap = self.grid
+        tilemap.offgrid_tiles = self.offgrid
+        tilemap.solid_cells = self.solid_cells
+        tilemap.tile_size = self.tile_size
+        game.background = self.background
+        game.leaf_spawners = self.leaf_spawners
+        game.player.pos = list(self.player_pos)
+        game.player.air_time = 0
+        for entity, pos in self.spawned:
+            entity.reset(pos)
+        game.enemies, game.boxes, game.birds, game.mobs, game.demo_boards = (list(group) for group in self.groups)
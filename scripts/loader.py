@@ -0,0 +1,77 @@
+import os
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from scripts.utils import Animation
+from scripts.assetcache import cache
+from scripts.constants import BASE_IMG_PATH, IMAGE_EXTENSIONS
+
+
+class Pending:
+    # a queued asset; result() is only valid once AssetLoader.wait() has returned
+    __slots__ = ("futures", "finish", "value")
+
+    def __init__(self, futures, finish):
+        self.futures = futures
+        self.finish = finish
+        self.value = None
+
+    def result(self):
+        return self.value
+
+
+def finish_image(img, alpha, color_key):
+    # same conversion as utils.load_image, it needs the display so it runs on the main thread
+    if alpha < 255:
+        img = img.convert_alpha()
+        img.set_alpha(alpha)
+    else:
+        img = img.convert()
+    img.set_colorkey(color_key)
+    return img
+
+
+class AssetLoader:
+    # decodes files on a thread pool; pixel format conversion and anything touching the display stays on the main thread
+    def __init__(self, workers=None):
+        self.pool = ThreadPoolExecutor(workers or min(8, os.cpu_count() or 1))
+        self.pending = []
+
+    def queue(self, paths, decode, finish):
+        pending = Pending([self.pool.submit(decode, path) for path in paths], finish)
+        self.pending.append(pending)
+        return pending
+
+    def image(self, path, alpha=255, color_key=(0, 0, 0)):
+        return self.queue([BASE_IMG_PATH + path], cache.load_surface, lambda imgs: finish_image(imgs[0], alpha, color_key))
+
+    def images(self, path, alpha=255, color_key=(0, 0, 0)):
+        full_path = os.path.join(BASE_IMG_PATH, path)
+        names = [name for name in sorted(os.listdir(full_path)) if name.endswith(IMAGE_EXTENSIONS)]
+        return self.queue(
+            [os.path.join(full_path, name) for name in names],
+            cache.load_surface,
+            lambda imgs: [finish_image(img, alpha, color_key) for img in imgs],
+        )
+
+    def animation(self, path, img_dur=5, loop=True, color_key=(0, 0, 0)):
+        images = self.images(path, color_key=color_key)
+        pending = Pending([], lambda _: Animation(images.value, img_dur=img_dur, loop=loop))
+        self.pending.append(pending)
+        return pending
+
+    def sound(self, path):
+        return self.queue([path], cache.load_sound, lambda sounds: sounds[0])
+
+    def wait(self, progress=None):
+        # progress(done, total) is called from this thread while files are still decoding
+        futures = [future for pending in self.pending for future in pending.futures]
+        remaining = set(futures)
+        while remaining:
+            _, remaining = wait(remaining, timeout=1 / 30, return_when=FIRST_COMPLETED)
+            if progress:
+                progress(len(futures) - len(remaining), len(futures))
+        self.pool.shutdown()
+        cache.save()
+        for pending in self.pending:
+            pending.value = pending.finish([future.result() for future in pending.futures])
+        self.pending = []
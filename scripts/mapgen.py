@@ -0,0 +1,159 @@
+import argparse
+import os
+import random
+
+from scripts.tilemap import Tilemap, PHYSICS_TILES
+
+# the player dies below y 500, so the floor sits at row 24 and taller maps grow upwards
+FLOOR_ROW = 24
+# image heights per variant, so decor is placed standing on the surface
+DECOR_HEIGHTS = {"decor": [16, 16, 16, 16], "large_decor": [9, 12, 44]}
+SPAWNER_VARIANTS = {"player": 0, "enemy": 1, "box": 2, "bird": 3, "mob": 4}
+DEFAULT_DENSITY = {"grass": 0.06, "stone": 0.02, "ice": 0.01}
+DEFAULT_SPAWNERS = {"player": 1, "enemy": 4, "box": 4, "bird": 2, "mob": 1}
+
+
+def generate(
+    width=120,
+    height=24,
+    density=None,
+    water=0.1,
+    decor=40,
+    spawners=None,
+    clouds=3,
+    seed=None,
+    tile_size=16,
+    background_index=0,
+):
+    # density maps each PHYSICS_TILES type to the fraction of the width * height cells it fills,
+    # water is the fraction of floor columns turned into pools
+    rng = random.Random(seed)
+    density = DEFAULT_DENSITY if density is None else density
+    counts = dict(DEFAULT_SPAWNERS)
+    counts.update(spawners or {})
+    for tile_type in density:
+        if tile_type not in PHYSICS_TILES:
+            raise ValueError("unknown terrain type " + tile_type)
+    for name in counts:
+        if name not in SPAWNER_VARIANTS:
+            raise ValueError("unknown spawner " + name)
+
+    types = list(density) or ["grass"]
+    tilemap = Tilemap(None, tile_size=tile_size)
+    grid = tilemap.tilemap
+    top = FLOOR_ROW - height + 1
+
+    def put(x, y, tile_type):
+        grid[str(x) + ";" + str(y)] = {"type": tile_type, "variant": 0, "pos": [x, y]}
+
+    # two rows of floor, cut by pools one tile deep
+    floor_type = max(types, key=lambda tile_type: density.get(tile_type, 0))
+    pools = set()
+    # pools are drawn from the columns between the two edge tiles, so more than that can never be reached
+    while len(pools) < min(int(width * water), width - 2):
+        start = rng.randrange(1, width - 1)
+        for x in range(start, min(width - 1, start + rng.randint(2, 8))):
+            pools.add(x)
+    for x in range(width):
+        put(x, FLOOR_ROW, "water" if x in pools else floor_type)
+        put(x, FLOOR_ROW + 1, floor_type)
+
+    # floating platforms until every terrain type reaches its share of the grid
+    placed = {tile_type: 0 for tile_type in types}
+    placed[floor_type] += width * 2 - len(pools)
+    # platforms sit two rows clear of the top and three clear of the floor; a map too low for that gets none
+    platform_rows = (top + 2, FLOOR_ROW - 3) if top + 2 < FLOOR_ROW - 3 else None
+    for tile_type in types if platform_rows else []:
+        target = int(width * height * density.get(tile_type, 0))
+        attempts = 0
+        while placed[tile_type] < target and attempts < target * 4:
+            attempts += 1
+            length = rng.randint(3, 12)
+            thickness = rng.randint(1, 3)
+            x0 = rng.randrange(0, max(1, width - length))
+            y0 = rng.randrange(*platform_rows)
+            for x in range(x0, x0 + length):
+                for y in range(y0, min(FLOOR_ROW - 2, y0 + thickness)):
+                    if str(x) + ";" + str(y) not in grid:
+                        put(x, y, tile_type)
+                        placed[tile_type] += 1
+    tilemap.autotile()
+
+    # standing spots: solid tiles with two free cells above them
+    surfaces = []
+    for tile in grid.values():
+        x, y = tile["pos"]
+        if tile["type"] in PHYSICS_TILES and str(x) + ";" + str(y - 1) not in grid and str(x) + ";" + str(y - 2) not in grid:
+            surfaces.append((x, y))
+    surfaces.sort()
+    if not surfaces:
+        raise ValueError("map has no free surface to place spawners on")
+
+    offgrid = tilemap.offgrid_tiles
+    for _ in range(decor):
+        x, y = rng.choice(surfaces)
+        tile_type = rng.choice(list(DECOR_HEIGHTS))
+        variant = rng.randrange(len(DECOR_HEIGHTS[tile_type]))
+        offgrid.append({"type": tile_type, "variant": variant, "pos": [x * tile_size, y * tile_size - DECOR_HEIGHTS[tile_type][variant]]})
+    for name, count in counts.items():
+        for _ in range(count):
+            x, y = rng.choice(surfaces)
+            offgrid.append({"type": "spawners", "variant": SPAWNER_VARIANTS[name], "pos": [x * tile_size, (y - 1) * tile_size]})
+    for i in range(clouds):
+        x = rng.randrange(width)
+        grid[str(x) + ";" + str(top - i * 2)] = {"type": "clouds", "variant": 0, "pos": [x, top - i * 2]}
+
+    return tilemap, background_index
+
+
+def save_map(path, **params):
+    tilemap, background_index = generate(**params)
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tilemap.save(path, background_index=background_index)
+    return tilemap
+
+
+def parse_pairs(values, cast):
+    pairs = {}
+    for value in values or []:
+        name, _, amount = value.partition("=")
+        pairs[name] = cast(amount)
+    return pairs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="write a generated stress map in the Tilemap.save format")
+    parser.add_argument("out", help="map json to write, load it with python game.py --map OUT")
+    parser.add_argument("--width", type=int, default=120, help="map width in tiles")
+    parser.add_argument("--height", type=int, default=24, help="map height in tiles, from the floor up")
+    parser.add_argument("--density", action="append", metavar="TYPE=FRACTION", help="terrain share per tile type, e.g. grass=0.06")
+    parser.add_argument("--water", type=float, default=0.1, help="fraction of floor columns turned into pools")
+    parser.add_argument("--decor", type=int, default=40, help="number of offgrid decor pieces")
+    parser.add_argument("--spawn", action="append", metavar="KIND=COUNT", help="spawner count for player, enemy, box, bird or mob")
+    parser.add_argument("--clouds", type=int, default=3)
+    parser.add_argument("--background", type=int, default=0)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+    if not 0 <= args.water < 1:
+        parser.error("--water must be at least 0 and below 1")
+
+    tilemap = save_map(
+        args.out,
+        width=args.width,
+        height=args.height,
+        density=parse_pairs(args.density, float) or None,
+        water=args.water,
+        decor=args.decor,
+        spawners=parse_pairs(args.spawn, int),
+        clouds=args.clouds,
+        seed=args.seed,
+        background_index=args.background,
+    )
+    spawns = sum(1 for tile in tilemap.offgrid_tiles if tile["type"] == "spawners")
+    print(str(len(tilemap.tilemap)) + " tiles, " + str(spawns) + " spawners")
+
+
+if __name__ == "__main__":
+    main()
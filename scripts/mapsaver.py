@@ -0,0 +1,51 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from scripts.tilemap import write_map
+
+AUTOSAVE_DIR = ".cache/autosave"
+
+
+class MapSaver:
+    # the editor takes a snapshot on its own thread and one worker does the json and the disk, in the order asked
+    def __init__(self):
+        self.pool = ThreadPoolExecutor(1)
+        self.pending = {}
+        self.saved_version = None
+
+    def save(self, tilemap, path, background_index=0, version=None):
+        if version is not None:
+            self.saved_version = version
+        self.pending[path] = self.pool.submit(self.write, path, tilemap.snapshot(background_index), version)
+
+    def write(self, path, data, version):
+        # runs on the worker. a failure is reported as it happens, including autosaves nobody waits on
+        try:
+            write_map(path, data)
+        except Exception as error:
+            print(path + " not saved: " + str(error))
+            # so the next autosave tries again instead of treating this version as written
+            if version is not None and self.saved_version == version:
+                self.saved_version = None
+            return False
+        return True
+
+    def autosave(self, tilemap, name, background_index, version):
+        # skipped while nothing changed since the last save, or while the previous autosave is still being written
+        path = os.path.join(AUTOSAVE_DIR, name)
+        if version == self.saved_version or not self.idle(path):
+            return False
+        os.makedirs(AUTOSAVE_DIR, exist_ok=True)
+        self.save(tilemap, path, background_index, version)
+        return True
+
+    def idle(self, path):
+        future = self.pending.get(path)
+        return future is None or future.done()
+
+    def wait(self):
+        # returns once every write has finished. a failed one was already reported and must not take the editor down
+        # with the map still in memory; the paths that failed are returned
+        failed = [path for path, future in self.pending.items() if not future.result()]
+        self.pending.clear()
+        return failed
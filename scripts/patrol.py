@@ -0,0 +1,70 @@
+import math
+
+from scripts.spark import Spark
+from scripts.entities import COL_LEFT, COL_RIGHT
+
+# one draw per agent from this range: rolls below WALK_CHANCE_ROLLS start a walk (1%),
+# and the roll itself picks its length in [30, 120]
+WALK_MIN = 30
+WALK_CHANCE_ROLLS = 91
+PATROL_ROLLS = range(WALK_CHANCE_ROLLS * 100)
+
+
+class PatrolAI:
+    def __init__(self, game):
+        self.game = game
+
+    def step(self, agents, tilemap):
+        count = len(agents)
+        if not count:
+            return []
+        solid_cells = tilemap.solid_cells
+        tile_size = tilemap.tile_size
+        rolls = self.game.rng.choices(PATROL_ROLLS, k=count)
+
+        movements = [(0, 0)] * count
+        finished = []
+        for i, agent in enumerate(agents):
+            walking = agent.walking
+            if walking:
+                probe_x = agent.rect().centerx + (-7 if agent.flip else 7)
+                probe_y = agent.pos[1] + 23
+                if (int(probe_x // tile_size), int(probe_y // tile_size)) in solid_cells:
+                    if agent.collisions & (COL_LEFT | COL_RIGHT):
+                        agent.flip = not agent.flip
+                    else:
+                        movements[i] = (-0.5 if agent.flip else 0.5, 0)
+                else:
+                    agent.flip = not agent.flip
+                agent.walking = walking - 1
+                if walking == 1:
+                    finished.append(agent)
+            elif rolls[i] < WALK_CHANCE_ROLLS:
+                agent.walking = WALK_MIN + rolls[i]
+
+        if finished:
+            px, py = self.game.player.pos
+            for agent in finished:
+                dx = px - agent.pos[0]
+                if abs(py - agent.pos[1]) < 16:
+                    if agent.flip and dx < 0:
+                        self.shoot(agent, -1)
+                    if not agent.flip and dx > 0:
+                        self.shoot(agent, 1)
+        return movements
+
+    def shoot(self, agent, direction):
+        game = self.game
+        rect = agent.rect()
+        if direction < 0:
+            game.sound_queue.emit("shoot", rect.center)
+        projectile = [[rect.centerx + 7 * direction, rect.centery], 1.5 * direction, 0, False]
+        game.projectiles.append(projectile)
+        for i in range(4):
+            game.sparks.append(
+                Spark(
+                    projectile[0],
+                    self.game.rng.random() - 0.5 + (math.pi if direction < 0 else 0),
+                    2 + self.game.rng.random(),
+                )
+            )
@@ -0,0 +1,159 @@
+import csv
+import json
+import time
+import tracemalloc
+from collections import deque
+
+import pygame
+
+# stacked graph colours; sub-phases such as "tilemap/grid" are listed but not stacked
+PHASE_COLORS = {
+    "background": (160, 160, 160),
+    "clouds": (200, 200, 255),
+    "tilemap": (80, 220, 80),
+    "entities": (220, 60, 60),
+    "projectiles": (255, 165, 0),
+    "sparks": (255, 255, 0),
+    "outline": (200, 100, 255),
+    "particles": (0, 200, 200),
+    "events": (255, 192, 203),
+    "transition": (210, 140, 80),
+    "scale": (90, 140, 255),
+}
+
+
+class Section:
+    __slots__ = ("profiler", "name", "start", "traced")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.start = 0
+        self.traced = 0
+
+    def __enter__(self):
+        if self.profiler.track_allocations:
+            self.traced = tracemalloc.get_traced_memory()[0]
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        profiler = self.profiler
+        profiler.times[self.name] = profiler.times.get(self.name, 0) + elapsed
+        if profiler.track_allocations:
+            # net bytes the phase left allocated: traced size on exit minus on entry. the peak is never reset, so nested phases stay correct
+            grown = tracemalloc.get_traced_memory()[0] - self.traced
+            profiler.net_bytes[self.name] = profiler.net_bytes.get(self.name, 0) + grown
+        return False
+
+
+class NullSection:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NULL_SECTION = NullSection()
+
+
+class Profiler:
+    def __init__(self, enabled=False, capacity=600, track_allocations=False):
+        # track_allocations needs tracemalloc running and slows every phase down; keep it off for timings
+        self.enabled = enabled
+        self.track_allocations = track_allocations
+        self.sections = {}
+        self.times = {}
+        self.net_bytes = {}
+        self.frames = deque(maxlen=capacity)
+        self.frame_start = time.perf_counter()
+
+    def section(self, name):
+        if not self.enabled:
+            return NULL_SECTION
+        section = self.sections.get(name)
+        if section is None:
+            section = self.sections[name] = Section(self, name)
+        return section
+
+    def begin_frame(self):
+        self.frame_start = time.perf_counter()
+
+    def end_frame(self, **counts):
+        # closes the current frame record: per-phase seconds, total, net allocated bytes and counts
+        if not self.enabled:
+            return
+        record = {"total": time.perf_counter() - self.frame_start, "phases": self.times}
+        if self.track_allocations:
+            record["net_bytes"] = self.net_bytes
+            self.net_bytes = {}
+        record.update(counts)
+        self.frames.append(record)
+        self.times = {}
+
+    def export(self, path):
+        # .csv gets one row per frame with a column per phase, anything else is written as JSON lines
+        frames = list(self.frames)
+        if path.endswith(".csv"):
+            phases = sorted({name for frame in frames for name in frame["phases"]})
+            counts = sorted({key for frame in frames for key in frame if key not in ("total", "phases", "net_bytes")})
+            f = open(path, "w", newline="")
+            writer = csv.writer(f)
+            writer.writerow(["frame", "total_ms"] + [name + "_ms" for name in phases] + counts)
+            for i, frame in enumerate(frames):
+                row = [i, frame["total"] * 1000]
+                row += [frame["phases"].get(name, 0) * 1000 for name in phases]
+                row += [frame.get(key, 0) for key in counts]
+                writer.writerow(row)
+            f.close()
+        else:
+            f = open(path, "w")
+            for frame in frames:
+                f.write(json.dumps(frame) + "\n")
+            f.close()
+        print(path + " saved (" + str(len(frames)) + " frames)")
+
+    def render(self, surf, font, budget_ms=1000 / 60, height=60):
+        frames = list(self.frames)[-surf.get_width() // 2 :]
+        if not frames:
+            return
+        graph = pygame.Surface((len(frames) * 2, height), pygame.SRCALPHA)
+        graph.fill((0, 0, 0, 160))
+        scale = height / (budget_ms * 2)
+        for x, frame in enumerate(frames):
+            y = height
+            for name, color in PHASE_COLORS.items():
+                ms = frame["phases"].get(name, 0) * 1000
+                if ms:
+                    bar = max(1, int(ms * scale))
+                    y -= bar
+                    pygame.draw.rect(graph, color, (x * 2, y, 2, bar))
+        budget_y = height - int(budget_ms * scale)
+        pygame.draw.line(graph, (255, 255, 255), (0, budget_y), (graph.get_width(), budget_y))
+        surf.blit(graph, (0, 0))
+
+        totals = [frame["total"] * 1000 for frame in frames]
+        last = frames[-1]
+        white = (255, 255, 255)
+        lines = [
+            ("frame %.2f ms  avg %.2f  max %.2f" % (totals[-1], sum(totals) / len(totals), max(totals)), white),
+            (
+                "entities %d  particles %d  sparks %d  projectiles %d"
+                % (last.get("entities", 0), last.get("particles", 0), last.get("sparks", 0), last.get("projectiles", 0)),
+                white,
+            ),
+        ]
+        for name, ms in sorted(last["phases"].items(), key=lambda item: -item[1]):
+            lines.append(("%s %.2f" % (name, ms * 1000), PHASE_COLORS.get(name, white)))
+        texts = [font.render(line, True, color) for line, color in lines]
+        backdrop = pygame.Surface((max(text.get_width() for text in texts) + 4, sum(text.get_height() for text in texts) + 4), pygame.SRCALPHA)
+        backdrop.fill((0, 0, 0, 160))
+        surf.blit(backdrop, (0, height))
+        y = height + 2
+        for text in texts:
+            surf.blit(text, (2, y))
+            y += text.get_height()
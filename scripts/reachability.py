@@ -0,0 +1,263 @@
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import time
+from collections import deque
+
+from scripts.tilemap import Tilemap, SWIM_TILES
+
+# bump when the movement model changes so cached results are recomputed
+MODEL_VERSION = 1
+TILE = 16
+MAX_FRAMES = 240
+# the player body is treated as a point at its centre, started in the middle of its cell
+START = 8
+
+
+def simulate(hx, vx=0.0, vy=0.0, jump_at=None, double_at=None, dash_at=None):
+    # mirrors Player/PhysicsEntity.update in free air: input moves 1 px a frame, gravity 0.1 capped at 5,
+    # horizontal velocity decays by 0.1, a dash holds 8 px a frame for 9 frames.
+    # returns the cells the body passes through as (dx, dy, falling) offsets from the start cell
+    x = y = START
+    dashing = 0
+    path = []
+    last = (0, 0)
+    for frame in range(MAX_FRAMES):
+        if frame == jump_at:
+            vy = -2.5
+        if frame == double_at:
+            vy = -2.0
+        if frame == dash_at:
+            dashing = 60 if hx >= 0 else -60
+        x += hx + vx
+        y += vy
+        vy = min(5, vy + 0.1)
+        if dashing:
+            dashing += -1 if dashing > 0 else 1
+            if abs(dashing) > 50:
+                vx = 8 * (1 if dashing > 0 else -1) * (0.1 if abs(dashing) == 51 else 1)
+        vx = max(vx - 0.1, 0) if vx > 0 else min(vx + 0.1, 0)
+        cell = (int(x // TILE), int(y // TILE))
+        if cell == last:
+            continue
+        falling = vy > 0
+        if cell[0] != last[0] and cell[1] != last[1]:
+            # diagonal moves go through the horizontal neighbour first so corners cannot be cut
+            path.append((cell[0], last[1], falling))
+        path.append((cell[0], cell[1], falling))
+        last = cell
+        if cell[1] > 64:
+            break
+    return path
+
+
+def build_trie(paths):
+    trie = {}
+    for path in paths:
+        node = trie
+        for step in path:
+            node = node.setdefault(step, {})
+    return trie
+
+
+def ground_paths():
+    paths = []
+    for hx in (-1, 0, 1):
+        paths.append(simulate(hx, jump_at=0))
+        for double_at in (8, 16, 24):
+            paths.append(simulate(hx, jump_at=0, double_at=double_at))
+        if hx:
+            # walking off a ledge, and dashes from the ground, after a jump and after both jumps
+            paths.append(simulate(hx))
+            paths.append(simulate(hx, dash_at=0))
+            for dash_at in (8, 20):
+                paths.append(simulate(hx, jump_at=0, dash_at=dash_at))
+            paths.append(simulate(hx, jump_at=0, double_at=20, dash_at=30))
+    return paths
+
+
+def wall_paths(side):
+    # side is +1 for a wall on the right; wall jumps push 2 px a frame away from it
+    paths = []
+    for hx in (-1, 0, 1):
+        paths.append(simulate(hx, vx=-2 * side, vy=-2.5))
+        if hx:
+            paths.append(simulate(hx, vx=-2 * side, vy=-2.5, dash_at=10))
+    return paths
+
+
+GROUND = build_trie(ground_paths())
+WALLS = {side: build_trie(wall_paths(side)) for side in (-1, 1)}
+
+
+class Reach:
+    def __init__(self, tilemap):
+        self.solid = tilemap.solid_cells
+        self.water = {tuple(tile["pos"]) for tile in tilemap.tilemap.values() if tile["type"] in SWIM_TILES}
+        self.seen = set()
+        self.touched = set()
+        self.queue = deque()
+
+    def add(self, cell):
+        if cell not in self.seen:
+            self.seen.add(cell)
+            self.queue.append(cell)
+
+    def walk(self, trie, start):
+        x0, y0 = start
+        solid = self.solid
+        water = self.water
+        touched = self.touched
+        stack = [(trie, start)]
+        while stack:
+            node, parent = stack.pop()
+            for step, child in node.items():
+                cell = (x0 + step[0], y0 + step[1])
+                if cell in solid:
+                    # blocked: landing when moving down, catching the wall when moving sideways
+                    if cell[1] > parent[1] or cell[0] != parent[0]:
+                        self.add(parent)
+                    continue
+                touched.add(cell)
+                if cell in water:
+                    self.add(cell)
+                    continue
+                if child:
+                    stack.append((child, cell))
+
+    def run(self, start):
+        solid = self.solid
+        self.add(start)
+        while self.queue:
+            x, y = cell = self.queue.popleft()
+            self.touched.add(cell)
+            if cell in self.water:
+                for neighbor in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+                    if neighbor in self.water:
+                        self.add(neighbor)
+                if (x, y - 1) not in self.water and (x, y - 1) not in solid:
+                    self.walk(GROUND, (x, y - 1))
+                continue
+            if (x, y + 1) in solid:
+                self.walk(GROUND, cell)
+            else:
+                # spawners in the air and wall slides drop straight down
+                self.fall(cell)
+            for side in (-1, 1):
+                if (x + side, y) in solid:
+                    self.walk(WALLS[side], cell)
+        return self.seen
+
+    def fall(self, cell):
+        x, y = cell
+        while y < cell[1] + 64:
+            if (x, y + 1) in self.solid:
+                self.add((x, y))
+                return
+            if (x, y + 1) in self.water:
+                self.add((x, y + 1))
+                return
+            y += 1
+            self.touched.add((x, y))
+
+
+def spawn_cell(tilemap, pos):
+    # cell of an 8x15 body placed at pos; spawners drawn slightly into the ground are pushed out on top
+    x, y = int((pos[0] + 4) // TILE), int((pos[1] + 8) // TILE)
+    while (x, y) in tilemap.solid_cells:
+        y -= 1
+    return x, y
+
+
+def analyze(tilemap):
+    spawners = tilemap.extract([("spawners", 0), ("spawners", 1)], keep=True)
+    players = [s for s in spawners if s["variant"] == 0]
+    enemies = [s for s in spawners if s["variant"] == 1]
+    if not players:
+        return {"enemies": len(enemies), "unreachable": [s["pos"] for s in enemies], "error": "no player spawner"}
+    reach = Reach(tilemap)
+    reach.run(spawn_cell(tilemap, players[0]["pos"]))
+    unreachable = []
+    for enemy in enemies:
+        x, y = spawn_cell(tilemap, enemy["pos"])
+        # the sword and a dash reach about a tile either side of the body
+        if not any((x + dx, y + dy) in reach.touched for dx in (-1, 0, 1) for dy in (-1, 0)):
+            unreachable.append(enemy["pos"])
+    return {"enemies": len(enemies), "unreachable": unreachable, "nodes": len(reach.seen)}
+
+
+def content_hash(path):
+    f = open(path, "rb")
+    digest = hashlib.sha1(f.read()).hexdigest()
+    f.close()
+    return digest + ":" + str(MODEL_VERSION)
+
+
+def analyze_file(path):
+    start = time.perf_counter()
+    tilemap = Tilemap(None, tile_size=TILE)
+    tilemap.load(path)
+    result = analyze(tilemap)
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+
+def analyze_paths(paths, cache_path=None, workers=None):
+    cache = {}
+    if cache_path and os.path.exists(cache_path):
+        f = open(cache_path, "r")
+        cache = json.load(f)
+        f.close()
+    keys = {path: content_hash(path) for path in paths}
+    results = {path: cache[keys[path]] for path in paths if keys[path] in cache}
+    todo = [path for path in paths if path not in results]
+    if todo:
+        workers = min(len(todo), workers or os.cpu_count() or 1)
+        if workers > 1:
+            with multiprocessing.get_context("spawn").Pool(workers) as pool:
+                fresh = pool.map(analyze_file, todo)
+        else:
+            fresh = [analyze_file(path) for path in todo]
+        for path, result in zip(todo, fresh):
+            results[path] = cache[keys[path]] = result
+        if cache_path:
+            directory = os.path.dirname(cache_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            f = open(cache_path, "w")
+            json.dump(cache, f)
+            f.close()
+    return results, len(paths) - len(todo)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="check that every enemy spawner can be reached from the player spawner")
+    parser.add_argument("paths", nargs="*", default=["data/maps"], help="map json files or directories of them")
+    parser.add_argument("--cache", default=".cache/reachability.json", help="results keyed by map content hash")
+    parser.add_argument("--no-cache", action="store_true")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    paths = []
+    for path in args.paths:
+        if os.path.isdir(path):
+            paths += sorted(os.path.join(path, name) for name in os.listdir(path) if name.endswith(".json"))
+        else:
+            paths.append(path)
+    results, cached = analyze_paths(paths, None if args.no_cache else args.cache, args.workers)
+
+    failed = 0
+    for path in paths:
+        result = results[path]
+        status = result.get("error") or ("ok" if not result["unreachable"] else "unreachable " + str(result["unreachable"]))
+        failed += status != "ok"
+        print(f"{path:<32} {result['enemies']:>4} enemies {result.get('nodes', 0):>7} nodes {result.get('seconds', 0):>6.2f} s  {status}")
+    print(f"{len(paths)} maps, {cached} from cache, {failed} with unreachable enemies")
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+from scripts.loader import AssetLoader
+from scripts.utils import Animation
+
+# scene manifests: name -> (kind, path, options). the same file with the same options is
+# the same entry, so scenes that share assets share the loaded surfaces
+GAME_ASSETS = {
+    "colliders": ("images", "tiles/colliders", {}),
+    "decor": ("images", "tiles/decor", {}),
+    "grass": ("images", "tiles/grass", {}),
+    "herb": ("images", "tiles/herb", {}),
+    "large_decor": ("images", "tiles/large_decor", {}),
+    "stone": ("images", "tiles/stone", {}),
+    "water": ("images", "tiles/water", {}),
+    "ice": ("images", "tiles/ice", {}),
+    "player": ("image", "entities/player.png", {}),
+    "demo": ("images", "tiles/demo", {}),
+    "spawners": ("images", "tiles/spawners", {"color_key": (255, 255, 255)}),
+    "box": ("image", "entities/box.png", {}),
+    "backgrounds": ("images", "backgrounds", {}),
+    "clouds": ("images", "clouds", {}),
+    "demo_surf/idle": ("animation", "demo/surf/idle", {"img_dur": 6}),
+    "demo_hold/idle": ("animation", "demo/hold/idle", {"img_dur": 6}),
+    "box/idle": ("animation", "entities/box/idle", {"img_dur": 6}),
+    "box/destroy": ("animation", "entities/box/destroy", {"img_dur": 6}),
+    "enemy/idle": ("animation", "entities/enemy/idle", {"img_dur": 6}),
+    "enemy/run": ("animation", "entities/enemy/run", {"img_dur": 4}),
+    "player/idle": ("animation", "entities/player/idle", {"img_dur": 6}),
+    "player/hold": ("animation", "entities/player/hold", {"img_dur": 6}),
+    "player/run": ("animation", "entities/player/run", {"img_dur": 4}),
+    "player/jump": ("animation", "entities/player/jump", {"img_dur": 4, "loop": False}),
+    "player/slide": ("animation", "entities/player/slide", {}),
+    "player/wall_slide": ("animation", "entities/player/wall_slide", {}),
+    "player/deflect": ("animation", "entities/player/deflect", {}),
+    "player/powJump": ("animation", "entities/player/powJump", {}),
+    "player/attack": ("animation", "entities/player/attack", {"img_dur": 1, "loop": False}),
+    "player/swim": ("animation", "entities/player/swim", {"img_dur": 4}),
+    "player/push": ("animation", "entities/player/push", {"img_dur": 4, "loop": True}),
+    "particle/leaf": ("animation", "particles/leaf", {"img_dur": 20, "loop": False}),
+    "particle/particle": ("animation", "particles/particle", {"img_dur": 6, "loop": False}),
+    "gun": ("image", "gun.png", {}),
+    "projectile": ("image", "projectile.png", {}),
+    "def_projectile": ("image", "def_projectile.png", {}),
+    "bird/fly": ("animation", "entities/bird/fly", {"img_dur": 1}),
+    "bird/fly_b": ("animation", "entities/bird/fly_b", {"img_dur": 1}),
+    "bird/idle": ("animation", "entities/bird/idle", {}),
+    "mob/idle": ("animation", "entities/mob/idle", {"color_key": (20, 20, 20)}),
+    "mob/run": ("animation", "entities/mob/run", {"color_key": (20, 20, 20)}),
+}
+
+GAME_SOUNDS = {
+    "jump": ("sound", "data/sfx/jump.wav", {}),
+    "dash": ("sound", "data/sfx/dash.wav", {}),
+    "hit": ("sound", "data/sfx/hit.wav", {}),
+    "clonk": ("sound", "data/sfx/clonk.wav", {}),
+    "shoot": ("sound", "data/sfx/shoot.wav", {}),
+    "wind": ("sound", "data/sfx/wind.wav", {}),
+    "ambience": ("sound", "data/sfx/ambience.wav", {}),
+    "slash": ("sound", "data/sfx/slash.mp3", {}),
+    "parry": ("sound", "data/sfx/parry.mp3", {}),
+    "flight": ("sound", "data/sfx/flight.wav", {}),
+    "thump": ("sound", "data/sfx/thump.mp3", {}),
+}
+
+# the order here is the editor's tile palette order
+EDITOR_ASSETS = {
+    "grass": ("images", "tiles/grass", {}),
+    "herb": ("images", "tiles/herb", {}),
+    "ice": ("images", "tiles/ice", {}),
+    "stone": ("images", "tiles/stone", {}),
+    "water": ("images", "tiles/water", {}),
+    "spawners": ("images", "tiles/spawners", {}),
+    "decor": ("images", "tiles/decor", {}),
+    "large_decor": ("images", "tiles/large_decor", {}),
+    "clouds": ("images", "clouds", {}),
+    # the last demo tile is solid black, so the editor keys out (1, 1, 1) to keep it visible
+    "demo": ("images", "tiles/demo", {"color_key": (1, 1, 1)}),
+    "colliders": ("images", "tiles/colliders", {}),
+}
+
+EDITOR_BACKGROUNDS = {
+    "backgrounds": ("images", "backgrounds", {}),
+}
+
+
+def entry_key(kind, path, options):
+    # animations are frames plus timing, so the frames are shared with plain image loads of the same folder
+    if kind == "animation":
+        kind = "images"
+    return (kind, path, options.get("alpha", 255), tuple(options.get("color_key", (0, 0, 0))))
+
+
+def split_actions(assets):
+    # "player/run" -> animations["player"]["run"], resolved once so entities never build the key strings
+    animations = {}
+    for name, asset in assets.items():
+        if isinstance(asset, Animation):
+            e_type, action = name.split("/", 1)
+            animations.setdefault(e_type, {})[action] = asset
+    return animations
+
+
+class AssetRegistry:
+    # loads each (kind, path, alpha, colour key) once per process; scenes hold references
+    # through their manifests and unload() drops whatever no other scene still uses
+    def __init__(self):
+        self.entries = {}
+        self.scenes = {}
+        self.loads = 0
+        self.reuses = 0
+
+    def preload(self, scene, *manifests, progress=None):
+        # every manifest shares one loader so the progress callback sees a single pass
+        loader = None
+        pending = {}
+        for manifest in manifests:
+            for kind, path, options in manifest.values():
+                key = entry_key(kind, path, options)
+                if key in self.entries or key in pending:
+                    self.reuses += 1
+                    continue
+                if loader is None:
+                    loader = AssetLoader()
+                if kind == "animation":
+                    pending[key] = loader.images(path, color_key=options.get("color_key", (0, 0, 0)))
+                else:
+                    pending[key] = getattr(loader, kind)(path, **options)
+                self.loads += 1
+        if loader:
+            loader.wait(progress)
+        for key, value in pending.items():
+            self.entries[key] = value.result()
+
+        loaded = []
+        for manifest in manifests:
+            self.scenes.setdefault(scene, {}).update(manifest)
+            assets = {}
+            for name, (kind, path, options) in manifest.items():
+                value = self.entries[entry_key(kind, path, options)]
+                if kind == "animation":
+                    value = Animation(value, img_dur=options.get("img_dur", 5), loop=options.get("loop", True))
+                assets[name] = value
+            loaded.append(assets)
+        return loaded
+
+    def unload(self, scene):
+        manifest = self.scenes.pop(scene, {})
+        kept = set()
+        for other in self.scenes.values():
+            for spec in other.values():
+                kept.add(entry_key(*spec))
+        for spec in manifest.values():
+            key = entry_key(*spec)
+            if key not in kept:
+                self.entries.pop(key, None)
+
+
+registry = AssetRegistry()
@@ -0,0 +1,60 @@
+import json
+import zlib
+
+
+class InputLog:
+    # events are [frame, event_type, value]: value is the key for KEYDOWN/KEYUP and [w, h] for VIDEORESIZE
+    def __init__(self, level=0, seed=0, events=None, hashes=None, size=None):
+        self.level = level
+        self.seed = seed
+        self.size = size
+        self.events = events if events is not None else []
+        self.hashes = hashes if hashes is not None else []
+        self.by_frame = {}
+        for frame, event_type, value in self.events:
+            self.by_frame.setdefault(frame, []).append((event_type, tuple(value) if isinstance(value, list) else value))
+        self.mismatch = None
+
+    def record(self, frame, event_type, value):
+        self.events.append([frame, event_type, list(value) if isinstance(value, tuple) else value])
+
+    def events_at(self, frame):
+        return self.by_frame.get(frame, ())
+
+    def check(self, frame, state_hash):
+        # hashes[i] is the state after tick i; remembers the first tick that diverges
+        if frame < len(self.hashes) and self.hashes[frame] != state_hash and self.mismatch is None:
+            self.mismatch = frame
+            print("replay diverged at frame " + str(frame))
+
+    def finished(self, frame):
+        return frame >= len(self.hashes)
+
+    def save(self, path):
+        f = open(path, "w")
+        json.dump({"level": self.level, "seed": self.seed, "size": self.size, "events": self.events, "hashes": self.hashes}, f)
+        f.close()
+        print(path + " saved")
+
+
+def load_log(path):
+    f = open(path, "r")
+    data = json.load(f)
+    f.close()
+    return InputLog(data["level"], data["seed"], data["events"], data.get("hashes", []), data.get("size"))
+
+
+def state_hash(game):
+    state = (
+        game.level,
+        game.dead,
+        game.player.pos,
+        game.player.velocity,
+        game.player.action,
+        [(e.pos, e.alive, e.walking, e.flip) for e in game.enemies],
+        [(b.pos, b.is_held) for b in game.boxes],
+        [(b.pos, b.flight) for b in game.birds],
+        [(m.pos, m.walking) for m in game.mobs],
+        game.projectiles,
+    )
+    return zlib.crc32(repr(state).encode())
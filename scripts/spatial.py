@@ -0,0 +1,93 @@
+import pygame
+
+
+class SpatialHash:
+    def __init__(self, cell_size=32):
+        self.cell_size = cell_size
+        self.cells = {}
+        self.count = 0
+
+    def clear(self):
+        self.cells.clear()
+        self.count = 0
+
+    def cell_range(self, rect):
+        size = self.cell_size
+        return (
+            int(rect.left // size),
+            int(rect.top // size),
+            int((rect.right - 1) // size),
+            int((rect.bottom - 1) // size),
+        )
+
+    def insert(self, item, rect):
+        # items are stored with their insertion index so queries come back in list order
+        entry = (self.count, item)
+        self.count += 1
+        x0, y0, x1, y1 = self.cell_range(rect)
+        for x in range(x0, x1 + 1):
+            for y in range(y0, y1 + 1):
+                cell = self.cells.get((x, y))
+                if cell is None:
+                    self.cells[(x, y)] = [entry]
+                else:
+                    cell.append(entry)
+
+    def remove(self, item, rect):
+        x0, y0, x1, y1 = self.cell_range(rect)
+        for x in range(x0, x1 + 1):
+            for y in range(y0, y1 + 1):
+                cell = self.cells.get((x, y))
+                if cell:
+                    cell[:] = [entry for entry in cell if entry[1] is not item]
+                    if not cell:
+                        del self.cells[(x, y)]
+
+    def rebuild(self, entities):
+        self.clear()
+        for entity in entities:
+            self.insert(entity, entity.rect())
+
+    def query(self, rect, margin=0):
+        x0, y0, x1, y1 = self.cell_range(rect.inflate(margin * 2, margin * 2) if margin else rect)
+        cells = self.cells
+        found = {}
+        for x in range(x0, x1 + 1):
+            for y in range(y0, y1 + 1):
+                cell = cells.get((x, y))
+                if cell:
+                    for index, item in cell:
+                        found[index] = item
+        return [found[index] for index in sorted(found)]
+
+    def query_point(self, pos):
+        cell = self.cells.get((int(pos[0] // self.cell_size), int(pos[1] // self.cell_size)))
+        if not cell:
+            return []
+        return [item for _, item in cell]
+
+
+class OffgridIndex:
+    # offgrid tiles bucketed by the area their image covers, so the editor's cursor tools only test tiles near the mouse
+    def __init__(self, sizes, cell_size=32):
+        self.sizes = sizes
+        self.grid = SpatialHash(cell_size)
+
+    def rect(self, tile):
+        # a pixel wider on each side than the image: the exact test is done in screen space, where truncation can differ by one
+        width, height = self.sizes[tile["type"]][tile["variant"]]
+        return pygame.Rect(int(tile["pos"][0]) - 1, int(tile["pos"][1]) - 1, width + 2, height + 2)
+
+    def add(self, tile):
+        self.grid.insert(tile, self.rect(tile))
+
+    def remove(self, tile):
+        self.grid.remove(tile, self.rect(tile))
+
+    def rebuild(self, tiles):
+        self.grid.clear()
+        for tile in tiles:
+            self.add(tile)
+
+    def query_point(self, pos):
+        return self.grid.query_point(pos)
@@ -1,6 +1,8 @@
 import json
+import os
+import threading
 
-import pygame
+# pygame is imported by the methods that collide or draw, so mapgen and reachability can load maps without it
 
 AUTOTILE_MAP = {
 	tuple(sorted([(1, 0), (0, 1)])): 0,
@@ -28,6 +30,8 @@ PHYSICS_TILES = {"grass", "stone", "ice"}
 SWIM_TILES = {"water"}
 AUTOTILE_TYPES = {"grass", "stone", "ice"}
 COLLIDER_TYLES = {"colliders"}
+# AUTOTILE_MAP keyed by a bit per matching neighbour: left, up, down, right
+AUTOTILE_MASKS = {sum(1 << [(-1, 0), (0, -1), (0, 1), (1, 0)].index(shift) for shift in neighbors): variant for neighbors, variant in AUTOTILE_MAP.items()}
 
 
 class Tilemap:
@@ -36,6 +40,7 @@ class Tilemap:
 		self.tile_size = tile_size
 		self.tilemap = {}
 		self.offgrid_tiles = []
+		self.solid_cells = set()
 
 	def extract(self, id_pairs, keep=False):
 		matches = []
@@ -72,19 +77,17 @@ class Tilemap:
 		return tiles
 
 	def save(self, path, background_index=0, map_atitude=0):
-		f = open(path, "w")
-		json.dump(
-			{
-				"map_altitude": map_atitude,
-				"tilemap": self.tilemap,
-				"tile_size": self.tile_size,
-				"offgrid": self.offgrid_tiles,
-				"background_index": background_index,
-			},
-			f,
-		)
-		f.close()
-		print(path + " saved")
+		write_map(path, self.snapshot(background_index, map_atitude))
+
+	def snapshot(self, background_index=0, map_atitude=0):
+		# shallow copies are enough: the editor replaces tile dicts instead of editing them, so this can be written on another thread
+		return {
+			"map_altitude": map_atitude,
+			"tilemap": dict(self.tilemap),
+			"tile_size": self.tile_size,
+			"offgrid": list(self.offgrid_tiles),
+			"background_index": background_index,
+		}
 
 	def load(self, path):
 		f = open(path, "r")
@@ -94,10 +97,22 @@ class Tilemap:
 		self.tilemap = map_data["tilemap"]
 		self.tile_size = map_data["tile_size"]
 		self.offgrid_tiles = map_data["offgrid"]
+		self.build_index()
 		print(path + " loaded")
 		background_index = map_data.get("background_index", 0)
 		return background_index
 	
+	def adopt(self, other):
+		# take over a map parsed elsewhere (the level preloader) without reading the file again
+		self.tilemap = other.tilemap
+		self.tile_size = other.tile_size
+		self.offgrid_tiles = other.offgrid_tiles
+		self.solid_cells = other.solid_cells
+
+	def build_index(self):
+		# integer cell lookup for hot per-tick probes, rebuilt whenever the grid is replaced
+		self.solid_cells = {tuple(map(int, loc.split(";"))) for loc, tile in self.tilemap.items() if tile["type"] in PHYSICS_TILES}
+
 	def water_check(self, pos):
 		tile_loc = str(int(pos[0] // self.tile_size)) + ";" + str(int(pos[1] // self.tile_size))
 		if tile_loc in self.tilemap:
@@ -111,6 +126,7 @@ class Tilemap:
 				return self.tilemap[tile_loc]
 
 	def physics_rects_around(self, pos, tile_types=None):
+		import pygame
 		if tile_types is None:
 			tile_types = PHYSICS_TILES
 		rects = []
@@ -127,19 +143,170 @@ class Tilemap:
 		return rects
 
 	def autotile(self):
-		for loc in self.tilemap:
-			tile = self.tilemap[loc]
-			neighbors = set()
+		self.apply_cells({loc: dict(self.tilemap[loc], variant=variant) for loc, variant in self.autotile_variants().items()})
+
+	def autotile_variants(self):
+		# the new variant of every cell that autotiling would change, without touching the grid. neighbours are compared on integer cells
+		grid = self.tilemap
+		types = {(int(tile["pos"][0]), int(tile["pos"][1])): tile["type"] for tile in grid.values()}
+		get = types.get
+		variants = {}
+		for x, y in types:
+			tile_type = get((x, y))
+			if tile_type not in AUTOTILE_TYPES:
+				continue
+			mask = (get((x - 1, y)) == tile_type) | (get((x, y - 1)) == tile_type) << 1 | (get((x, y + 1)) == tile_type) << 2 | (get((x + 1, y)) == tile_type) << 3
+			if mask in AUTOTILE_MASKS:
+				loc = str(x) + ";" + str(y)
+				if AUTOTILE_MASKS[mask] != grid[loc]["variant"]:
+					variants[loc] = AUTOTILE_MASKS[mask]
+		return variants
+
+	def apply_cells(self, cells):
+		# writes many cells in one pass and keeps solid_cells in step; None clears a cell. returns what each cell held before
+		grid = self.tilemap
+		solid = self.solid_cells
+		before = {}
+		for loc, tile in cells.items():
+			old = grid.get(loc)
+			before[loc] = old
+			if tile is None:
+				if old is not None:
+					del grid[loc]
+					solid.discard((int(old["pos"][0]), int(old["pos"][1])))
+				continue
+			grid[loc] = tile
+			cell = (int(tile["pos"][0]), int(tile["pos"][1]))
+			if tile["type"] in PHYSICS_TILES:
+				solid.add(cell)
+			else:
+				solid.discard(cell)
+		return before
+
+	def fill_cells(self, region, tile_type=None, variant=0, autotile=False):
+		# the cells that fill a set of integer cells with one type; no tile_type clears them.
+		# with autotile the variants come out already tiled: a cell with all four neighbours inside the region is variant 8
+		# outright, so only the region's edge and the ring of tiles around it are compared against the grid
+		grid = self.tilemap
+		tiled = autotile and tile_type in AUTOTILE_TYPES
+		cells = {}
+		edge = []
+		for x, y in region:
+			if (x - 1, y) in region and (x + 1, y) in region and (x, y - 1) in region and (x, y + 1) in region:
+				if tile_type is None:
+					cells[str(x) + ";" + str(y)] = None
+				else:
+					cells[str(x) + ";" + str(y)] = {"type": tile_type, "variant": AUTOTILE_MASKS[15] if tiled else variant, "pos": [x, y]}
+			else:
+				edge.append((x, y))
+		if not autotile:
+			for x, y in edge:
+				cells[str(x) + ";" + str(y)] = None if tile_type is None else {"type": tile_type, "variant": variant, "pos": [x, y]}
+			return cells
+
+		types = {}
+
+		def type_at(cell):
+			if cell in region:
+				return tile_type
+			if cell not in types:
+				tile = grid.get(str(cell[0]) + ";" + str(cell[1]))
+				types[cell] = tile["type"] if tile else None
+			return types[cell]
+
+		def mask(x, y, cell_type):
+			return (type_at((x - 1, y)) == cell_type) | (type_at((x, y - 1)) == cell_type) << 1 | (type_at((x, y + 1)) == cell_type) << 2 | (type_at((x + 1, y)) == cell_type) << 3
+
+		ring = set()
+		for x, y in edge:
+			if tile_type is None:
+				cells[str(x) + ";" + str(y)] = None
+			else:
+				cells[str(x) + ";" + str(y)] = {"type": tile_type, "variant": AUTOTILE_MASKS.get(mask(x, y, tile_type), variant) if tiled else variant, "pos": [x, y]}
+			ring.update(cell for cell in ((x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1)) if cell not in region)
+		# tiles just outside now border something else
+		for x, y in ring:
+			cell_type = type_at((x, y))
+			if cell_type not in AUTOTILE_TYPES:
+				continue
+			loc = str(x) + ";" + str(y)
+			new = AUTOTILE_MASKS.get(mask(x, y, cell_type))
+			if new is not None and new != grid[loc]["variant"]:
+				cells[loc] = dict(grid[loc], variant=new)
+		return cells
+
+	def rect_cells(self, corner, other, tile_type=None, variant=0, autotile=False):
+		# every cell between two corners, inclusive. no tile_type clears them
+		x0, x1 = min(corner[0], other[0]), max(corner[0], other[0])
+		y0, y1 = min(corner[1], other[1]), max(corner[1], other[1])
+		return self.fill_cells({(x, y) for x in range(x0, x1 + 1) for y in range(y0, y1 + 1)}, tile_type, variant, autotile)
+
+	def flood_cells(self, start, tile_type, variant, corner, other, autotile=False):
+		# the 4-connected region holding the same type as start (or nothing), kept inside two corners so an open map cannot run away
+		grid = self.tilemap
+		x0, x1 = min(corner[0], other[0]), max(corner[0], other[0])
+		y0, y1 = min(corner[1], other[1]), max(corner[1], other[1])
+		tile = grid.get(str(start[0]) + ";" + str(start[1]))
+		target = tile["type"] if tile else None
+		if target == tile_type or not (x0 <= start[0] <= x1 and y0 <= start[1] <= y1):
+			return {}
+		region = set()
+		seen = {tuple(start)}
+		stack = [tuple(start)]
+		while stack:
+			x, y = stack.pop()
+			region.add((x, y))
 			for shift in [(1, 0), (-1, 0), (0, -1), (0, 1)]:
-				check_loc = str(tile["pos"][0] + shift[0]) + ";" + str(tile["pos"][1] + shift[1])
-				if check_loc in self.tilemap:
-					if self.tilemap[check_loc]["type"] == tile["type"]:
-						neighbors.add(shift)
-			neighbors = tuple(sorted(neighbors))
-			if (tile["type"] in AUTOTILE_TYPES) and (neighbors in AUTOTILE_MAP):
-				tile["variant"] = AUTOTILE_MAP[neighbors]
-
-	def render(self, surf, offset=(0, 0), scale=1.0, include="all", exclude="none"):
+				cell = (x + shift[0], y + shift[1])
+				if cell in seen or not (x0 <= cell[0] <= x1 and y0 <= cell[1] <= y1):
+					continue
+				seen.add(cell)
+				tile = grid.get(str(cell[0]) + ";" + str(cell[1]))
+				if (tile["type"] if tile else None) == target:
+					stack.append(cell)
+		return self.fill_cells(region, tile_type, variant, autotile)
+
+	def copy_region(self, corner, other):
+		# a stamp of the grid tiles and offgrid decor between two corners, relative to the top-left one
+		x0, x1 = min(corner[0], other[0]), max(corner[0], other[0])
+		y0, y1 = min(corner[1], other[1]), max(corner[1], other[1])
+		cells = {}
+		for x in range(x0, x1 + 1):
+			for y in range(y0, y1 + 1):
+				tile = self.tilemap.get(str(x) + ";" + str(y))
+				if tile:
+					cells[(x - x0, y - y0)] = (tile["type"], tile["variant"])
+		left, top = x0 * self.tile_size, y0 * self.tile_size
+		right, bottom = (x1 + 1) * self.tile_size, (y1 + 1) * self.tile_size
+		offgrid = []
+		for tile in self.offgrid_tiles:
+			if left <= tile["pos"][0] < right and top <= tile["pos"][1] < bottom:
+				offgrid.append((tile["pos"][0] - left, tile["pos"][1] - top, tile["type"], tile["variant"]))
+		return {"cells": cells, "offgrid": offgrid}
+
+	def stamp_cells(self, stamp, origin):
+		# the cells and offgrid tiles a stamp puts down with its top-left corner at origin
+		cells = {}
+		for (dx, dy), (tile_type, variant) in stamp["cells"].items():
+			x, y = origin[0] + dx, origin[1] + dy
+			cells[str(x) + ";" + str(y)] = {"type": tile_type, "variant": variant, "pos": [x, y]}
+		left, top = origin[0] * self.tile_size, origin[1] * self.tile_size
+		offgrid = [{"type": tile_type, "variant": variant, "pos": [left + dx, top + dy]} for dx, dy, tile_type, variant in stamp["offgrid"]]
+		return cells, offgrid
+
+	def render(self, surf, offset=(0, 0), scale=1.0, include="all", exclude="none", profiler=None):
+		# profiler times the two layers when given; the editor draws without one
+		if profiler is None:
+			self.render_offgrid(surf, offset, scale, include, exclude)
+			self.render_grid(surf, offset, scale, include, exclude)
+			return
+		with profiler.section("tilemap/offgrid"):
+			self.render_offgrid(surf, offset, scale, include, exclude)
+		with profiler.section("tilemap/grid"):
+			self.render_grid(surf, offset, scale, include, exclude)
+
+	def render_offgrid(self, surf, offset, scale, include, exclude):
+		import pygame
 		for tile in self.offgrid_tiles:
 			tile_type = tile["type"]
 			if include != "all" and tile_type not in include:
@@ -182,6 +349,8 @@ class Tilemap:
 				),
 			)
 
+	def render_grid(self, surf, offset, scale, include, exclude):
+		import pygame
 		for x in range(
 			int(offset[0] // self.tile_size),
 			int((offset[0] + surf.get_width() / scale) // self.tile_size + 1),
@@ -217,6 +386,7 @@ class Tilemap:
 					)
 
 	def render_whole(self, surf, scale=1.0, offset=(0, 0)):
+		import pygame
 		scaler = 3
 		init_offset = (50, 50)
 
@@ -269,3 +439,18 @@ class Tilemap:
 				rect_height,
 			),
 		)
+
+
+def write_map(path, data):
+	# written next to the target and swapped in, so a crash mid-write leaves the old map intact
+	tmp = path + "." + str(threading.get_ident()) + ".tmp"
+	f = open(tmp, "w")
+	try:
+		json.dump(data, f)
+	except BaseException:
+		f.close()
+		os.remove(tmp)
+		raise
+	f.close()
+	os.replace(tmp, path)
+	print(path + " saved")
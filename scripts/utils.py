@@ -2,14 +2,12 @@ import os
 import sys
 import pygame
 
-BASE_IMG_PATH = "data/images/"
-
-keys = {"quit": pygame.K_q, "mv_left": pygame.K_a, "mv_right": pygame.K_d, "mv_up": pygame.K_w, "mv_down": pygame.K_s, "jump": pygame.K_w, "dash": pygame.K_x, "surf": pygame.K_f, "attack": pygame.K_SPACE, "grab": pygame.K_e, "throw": pygame.K_SPACE, "menu": pygame.K_m}
-colors = {"WHITE": (255, 255, 255), "BLACK": (0, 0, 0), "RED": (255, 0, 0), "GREEN": (0, 255, 0), "BLUE": (0, 0, 255), "YELLOW": (255, 255, 0), "CYAN": (0, 255, 255), "MAGENTA": (255, 0, 255), "GRAY": (128, 128, 128), "DARK_GRAY": (64, 64, 64), "LIGHT_GRAY": (192, 192, 192), "ORANGE": (255, 165, 0), "PURPLE": (128, 0, 128), "BROWN": (139, 69, 19), "PINK": (255, 192, 203)}
+from scripts.assetcache import cache
+from scripts.constants import BASE_IMG_PATH, IMAGE_EXTENSIONS
 
 
 def load_image(path, alpha=255, color_key=(0, 0, 0)):
-	img = pygame.image.load(BASE_IMG_PATH + path)
+	img = cache.load_surface(BASE_IMG_PATH + path)
 
 	if alpha < 255:
 		img = img.convert_alpha()
@@ -25,7 +23,7 @@ def load_images(path, alpha=255, color_key=(0, 0, 0)):
 	images = []
 	full_path = os.path.join(BASE_IMG_PATH, path)
 	for img_name in sorted(os.listdir(full_path)):
-		if img_name.endswith((".png", ".jpg", ".bmp", ".gif")):
+		if img_name.endswith(IMAGE_EXTENSIONS):
 			images.append(load_image(os.path.join(path, img_name), alpha, color_key))
 	return images
 
@@ -59,6 +57,8 @@ def key_to_number(key):
 
 
 class Animation:
+	__slots__ = ("images", "img_duration", "loop", "done", "frame")
+
 	def __init__(self, images, img_dur=5, loop=True):
 		self.images = images
 		self.img_duration = img_dur